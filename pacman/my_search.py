@@ -1,4 +1,5 @@
 # Imports
+import time
 from util import Stack
 from util import Queue
 from util import PriorityQueue
@@ -12,20 +13,18 @@ class Node:
     is that by traversing all the way back to the root node via the parent
     nodes, we can get the direction from the root node to the current node
     '''
-    # Variables
-    state    = ();    # Uninitialized tuple which holds the current state
-    parent   = None;  # A pointer to the parent node
-    action   = None;  # The action it took to get to this state
-    cost     = 0;     # Total cost to get to the current status from the root node
-    heur     = 0;     # Total cost plus a heuristic to goal state
+    # Nodes are created for every state the search reaches, so they have
+    # slots instead of a dictionary per node, which takes a node from 112
+    # down to 72 bytes (CPython 3.11)
+    __slots__ = ('state', 'parent', 'action', 'cost', 'heur')
 
     # Initialization
     def __init__(self, s, p, a, c, h):
-        self.state   = s
-        self.parent  = p
-        self.action  = a
-        self.cost    = c
-        self.heur    = h
+        self.state   = s    # The current state
+        self.parent  = p    # A pointer to the parent node, None for the root
+        self.action  = a    # The action it took to get to this state
+        self.cost    = c    # Total cost to get to the current state from the root node
+        self.heur    = h    # Total cost plus a heuristic to goal state
 
     # Check if this is a root node
     def is_root(self):
@@ -33,15 +32,16 @@ class Node:
 
     # Get path from root to the current node
     def get_path_from_root(self):
-        # Check that a parent exists, otherwise we can never
-        # generate a path from root
-        assert self.parent
-        # Recursively call all parents to start generating
-        # a list of all actions
-        if self.parent.is_root():
-            return [self.action]
-        else:
-            return self.parent.get_path_from_root() + [self.action]
+        # Walk up the parents to the root, collecting the actions
+        # on the way, and reverse them. The path of the root node
+        # is empty
+        path = []
+        node = self
+        while node.parent is not None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
 
     # Print properties of a node
     def print_props(self):
@@ -57,6 +57,106 @@ class Node:
                   'cost:'         , self.cost,         \
                   'heur:'         , self.heur,         \
                   '::')
+class Frontier:
+    '''
+    This class holds the nodes that are waiting to be expanded. It keeps
+    track of the states that are queued, so a state is never on the frontier
+    more than once. For DFS and BFS a state that is already queued is
+    skipped. For A* and UCS the cheapest node of a state is kept: a node
+    that reaches a queued state at a lower priority replaces the queued node
+    in the priority queue (decrease-key), any other node is dropped
+    '''
+
+    # Initialization
+    def __init__(self, s_type='DFS'):
+        self.search_type = s_type
+        self.queued      = {}   # Queued states and their nodes
+        if s_type == 'DFS':
+            self.queue = Stack()
+        if s_type == 'BFS':
+            self.queue = Queue()
+        if s_type == 'Astar' or s_type == 'UCS':
+            self.queue = PriorityQueue()
+
+    def push(self, node, priority=0):
+        '''
+        Queue a node unless its state is already queued with the same or a
+        lower priority. Returns True if the node was queued
+        '''
+        if isinstance(self.queue, PriorityQueue):
+            if not self.queue.update(node, priority, node.state):
+                return False
+        else:
+            if node.state in self.queued:
+                return False
+            self.queue.push(node)
+        self.queued[node.state] = node
+        return True
+
+    def pop(self):
+        '''
+        Remove and return the next node to expand
+        '''
+        node = self.queue.pop()
+        del self.queued[node.state]
+        return node
+
+    def isEmpty(self):
+        return self.queue.isEmpty()
+
+    def __len__(self):
+        return len(self.queued)
+
+    def __contains__(self, state):
+        return state in self.queued
+
+class SearchResult(list):
+    '''
+    This class holds the result of a search. It is the list of actions
+    from the start state to the goal, so it can be used wherever a plain
+    list of actions is expected, together with the status of the search
+    and its statistics:
+      o status   - 'solved', 'no_path' if every reachable state has been
+                   explored without finding a goal, or 'budget_exhausted'
+      o budget   - the budget that ran out: 'expansions', 'time' or
+                   'memory' (None unless the budget was exhausted)
+      o expanded - number of nodes expanded
+      o frontier - number of nodes on the frontier at the end
+      o explored - number of explored states at the end
+      o elapsed  - wall-clock time of the search in seconds
+      o weight   - the cost of the path is at most weight times the
+                   cost of the cheapest path (for A* with an admissible
+                   heuristic, None for DFS and BFS)
+      o improved - for anytime A*, the (elapsed, cost, weight) of every
+                   path found, the last one being the path returned
+    A search that did not find a goal returns no actions
+    '''
+    def __init__(self, actions, status, budget, expanded, frontier, explored, elapsed,
+                 weight=None, improved=()):
+        list.__init__(self, actions)
+        self.status   = status
+        self.budget   = budget
+        self.expanded = expanded
+        self.frontier = frontier
+        self.explored = explored
+        self.elapsed  = elapsed
+        self.weight   = weight
+        self.improved = list(improved)
+
+    def stats(self):
+        '''
+        Return the status and statistics as a dictionary
+        '''
+        return {'status':   self.status,
+                'budget':   self.budget,
+                'actions':  len(self),
+                'expanded': self.expanded,
+                'frontier': self.frontier,
+                'explored': self.explored,
+                'elapsed':  self.elapsed,
+                'weight':   self.weight,
+                'improved': self.improved}
+
 class GenericSearch:
     '''
     This class implements a generic search algorithm. It can
@@ -64,39 +164,65 @@ class GenericSearch:
     '''
 
     # Variables
-    search_type = 'DFS'
+    search_type    = 'DFS'
+    # Budgets that guard against runaway searches, None for no limit
+    max_expansions = 1000000    # Nodes expanded
+    max_time       = None       # Wall-clock seconds
+    max_memory     = 2000000    # Nodes on the frontier plus explored states
+    result         = None       # The SearchResult of the last search
+    heuristic      = None       # Heuristic of A*, None for no heuristic
+    weight         = 1.0        # Weight of the heuristic of A*
 
-    def __init__(self, s_type='DFS'):
+    def __init__(self, s_type='DFS', heuristic=None, weight=1.0, **budgets):
         '''
         Initialize the type of search that is needed. The options are:
           o DFS - Depth first search
           o BFS - Breath first search
+          o UCS - Uniform cost search
           o Astar
+        A* orders the frontier by cost plus weight times heuristic(state,
+        problem), an estimate of the cost from a state to the nearest goal
+        such as the heuristics in searchAgents.py. A weight above 1
+        (weighted A*) expands fewer nodes for a path that costs at most
+        weight times the cheapest one. UCS orders the frontier by cost alone.
+        The search stops with a 'budget_exhausted' result once it has
+        expanded max_expansions nodes, run for max_time seconds or holds
+        max_memory nodes and explored states. The budgets are keyword
+        arguments, None for no limit. A budget that is not given is read
+        from the class when a search runs, so setting it on GenericSearch
+        changes it for every search that does not give its own
         '''
-        self.search_type = s_type
+        assert weight >= 1
+        self.search_type    = s_type
+        self.heuristic      = heuristic if s_type == 'Astar' else None
+        self.weight         = weight
+        self.heur_cache     = {}
+        for name, value in budgets.items():
+            if name not in ('max_expansions', 'max_time', 'max_memory'):
+                raise TypeError('unknown budget %r' % name)
+            setattr(self, name, value)
 
-    def get_hypotenuse(self, curr_st, goal_st):
+    def get_heuristic(self, st, problem):
         '''
-        This method is used to get a hypotenuse distance between
-        the current state and the goal
+        This method is used to get the heuristic value of a state. The
+        value of every state is computed once per search and cached, as
+        a state is reached many times and some heuristics are expensive
         '''
-        c_x, c_y = curr_st
-        g_x, g_y = goal_st
-        hyp = ( ((c_x-g_x)**2) + ((c_y-g_y)**2) )**0.5
-        # REVISIT: Add a correction to avoid same priorities
-        if (c_x-g_x)==0:
-            hyp = hyp - 0.5
-        return hyp
+        if self.heuristic is None:
+            return 0
+        h = self.heur_cache.get(st)
+        if h is None:
+            h = self.heur_cache[st] = self.heuristic(st, problem)
+        return h
 
-    def gen_root_node(self, st, g_st):
+    def gen_root_node(self, st, problem):
         '''
         This method is used to generate the root node given
         the starting state of a search problem
         '''
-        hyp = self.get_hypotenuse(st, g_st)
-        return Node(st, None, None, 0, hyp)
+        return Node(st, None, None, 0, self.weight * self.get_heuristic(st, problem))
 
-    def gen_node(self, p, s, g_st):
+    def gen_node(self, p, s, problem):
         '''
         This method is used to generate a node from a successor. The
         successor is a tuple of (state, action/direction, cost). This
@@ -104,7 +230,7 @@ class GenericSearch:
         '''
         # Calculate the total cost for the new node
         total_cost = p.cost + s[2]
-        total_heur = p.cost + s[2] + self.get_hypotenuse(s[0], g_st)
+        total_heur = p.cost + s[2] + self.weight * self.get_heuristic(s[0], problem)
         return Node(s[0], p, s[1], total_cost, total_heur)
 
     def search(self, problem):
@@ -115,24 +241,22 @@ class GenericSearch:
         generate a list of actions that can get us from the start
         state to the goal state
         '''
-        # Generate the root node
-        root_node = self.gen_root_node(problem.getStartState(), problem.goal)
+        # Generate the root node. The heuristic values of the last search
+        # do not apply to this problem
+        self.heur_cache = {}
+        root_node = self.gen_root_node(problem.getStartState(), problem)
 
         # Check that the search type is from a list of supported
         # ones
         assert                         \
             self.search_type=='DFS' or \
             self.search_type=='BFS' or \
+            self.search_type=='UCS' or \
             self.search_type=='Astar'
 
-        # Initialize the frontier depending on the search type
-        frontier = None
-        if self.search_type == 'DFS':
-            frontier = Stack()
-        if self.search_type == 'BFS':
-            frontier = Queue()
-        if self.search_type == 'Astar':
-            frontier = PriorityQueue()
+        # Initialize the frontier depending on the search type. The
+        # frontier holds at most one node per state
+        frontier = Frontier(self.search_type)
 
         # Initialize the frontier list to be pointing to the start
         # state where we being our search. Note that typically we will
@@ -140,20 +264,23 @@ class GenericSearch:
         # no need to perform that check here
         frontier.push(root_node, root_node.cost)
         search_iter = 0
+        start_time  = time.time()
         # Initialize the explored states to null, which is a dictionary. The
         # reason why we choose a dictionary is to be able to do a hash lookup
         # of a state to see if it exists or not
         explored_states = {}
-        # Run an infinite loop till we solve our problem.
+        # Run a loop till we solve our problem or run out of budget
         while 1:
-            # In order to not get genuinely stuck in an
-            # infinite loop, terminate if the search has iterated for
-            # too long
+            # A drained frontier means that there is no path to a goal
+            if frontier.isEmpty():
+                return self.finish([], 'no_path', None, search_iter, frontier, explored_states, start_time)
+            # In order to not get genuinely stuck in an infinite loop,
+            # terminate if the search has expanded too many nodes, run
+            # for too long or holds too many nodes
+            budget = self.check_budget(search_iter, frontier, explored_states, start_time, self.max_time)
+            if budget is not None:
+                return self.finish([], 'budget_exhausted', budget, search_iter, frontier, explored_states, start_time)
             search_iter +=1
-            assert search_iter<1000
-            # Catch illegal draining of frontiers before we have
-            # found a solution
-            assert not frontier.isEmpty()
             # Extract the current node based on search parameter
             # from the frontier to determine if we have found our
             # goal
@@ -164,14 +291,134 @@ class GenericSearch:
             # Check if the current node is our goal, if so, then
             # return the path from root to the goal.
             if problem.isGoalState(current_state):
-                return current_node.get_path_from_root()
+                return self.finish(current_node.get_path_from_root(), 'solved', None,
+                                   search_iter, frontier, explored_states, start_time)
             # If we haven't reached our goal, then generate all
-            # the successors for my frontier
+            # the successors for my frontier. A successor that is
+            # already on the frontier only replaces the queued node
+            # for A* and only if it is cheaper this way
             for s in problem.getSuccessors(current_state):
-                if s[0] not in explored_states.keys():
-                    new_node = self.gen_node(current_node, s, problem.goal)
+                if s[0] not in explored_states:
+                    new_node = self.gen_node(current_node, s, problem)
                     frontier.push(new_node, new_node.heur)
 
+    def anytime_search(self, problem, max_time=1.0, start_weight=3.0, step=0.5):
+        '''
+        This method is an anytime A* (ARA*). It runs weighted A* with a
+        large weight, which quickly finds a path that costs at most
+        start_weight times the cheapest one, and then improves the path
+        with weights lowered by step down to 1 for as long as max_time
+        seconds allow. Each round reuses the costs found by the earlier
+        ones: only the states whose cost went down since they were
+        expanded are queued again. The result holds the best path found
+        and the weight it is known to be within. It is 'budget_exhausted'
+        only if no path was found within the budgets
+        '''
+        self.heur_cache = {}
+        start_time = time.time()
+        weight     = max(1.0, start_weight)
+        best_cost  = {}     # Cheapest cost found so far for every state
+        expanded   = {}     # States expanded in any round
+        explored   = {}     # States expanded in the current round
+        incons     = {}     # Expanded states whose cost has gone down since
+        frontier   = Frontier('Astar')
+        goal_node  = None   # Cheapest node of a goal state found so far
+        improved   = []
+        search_iter = 0
+        root_node  = Node(problem.getStartState(), None, None, 0, 0)
+        best_cost[root_node.state] = 0
+        if problem.isGoalState(root_node.state):
+            goal_node = root_node
+        frontier.push(root_node, self.f_value(root_node, weight, problem))
+        while 1:
+            # Improve the path for the current weight. The path is as good
+            # as this weight allows once no node on the frontier has a
+            # lower priority than the cost of the path
+            budget = None
+            while not frontier.isEmpty():
+                # Every state reached keeps its cost, so all of them count
+                # against the memory budget
+                budget = self.check_budget(search_iter, frontier, best_cost, start_time, max_time)
+                if budget is not None:
+                    break
+                node     = frontier.pop()
+                priority = self.f_value(node, weight, problem)
+                if goal_node is not None and goal_node.cost <= priority:
+                    frontier.push(node, priority)
+                    break
+                search_iter += 1
+                expanded[node.state] = 1
+                explored[node.state] = 1
+                for s in problem.getSuccessors(node.state):
+                    cost = node.cost + s[2]
+                    if s[0] in best_cost and best_cost[s[0]] <= cost:
+                        continue
+                    best_cost[s[0]] = cost
+                    new_node = Node(s[0], node, s[1], cost, 0)
+                    if problem.isGoalState(s[0]) and (goal_node is None or cost < goal_node.cost):
+                        goal_node = new_node
+                    # A state expanded in this round is queued again in
+                    # the next round only
+                    if s[0] in explored:
+                        incons[s[0]] = new_node
+                    else:
+                        frontier.push(new_node, self.f_value(new_node, weight, problem))
+            # A round that ran to its end proves the weight of its path, a
+            # round cut short by a budget can only have found a cheaper path
+            if goal_node is not None:
+                if budget is None:
+                    improved.append((time.time() - start_time, goal_node.cost, weight))
+                elif not improved or goal_node.cost < improved[-1][1]:
+                    improved.append((time.time() - start_time, goal_node.cost,
+                                     improved[-1][2] if improved else None))
+            if budget is not None or weight <= 1.0:
+                break
+            # Lower the weight and queue the states of the last round that
+            # got cheaper again, with the priorities of the new weight
+            weight   = max(1.0, weight - step)
+            nodes    = list(frontier.queued.values()) + list(incons.values())
+            frontier = Frontier('Astar')
+            for node in nodes:
+                frontier.push(node, self.f_value(node, weight, problem))
+            explored = {}
+            incons   = {}
+        if goal_node is None:
+            return self.finish([], 'budget_exhausted' if budget else 'no_path', budget,
+                               search_iter, frontier, expanded, start_time)
+        self.finish(goal_node.get_path_from_root(), 'solved', None, search_iter, frontier, expanded, start_time)
+        self.result.weight   = improved[-1][2]
+        self.result.improved = improved
+        return self.result
+
+    def f_value(self, node, weight, problem):
+        '''
+        This method is used to get the priority of a node for weighted A*
+        '''
+        return node.cost + weight * self.get_heuristic(node.state, problem)
+
+    def check_budget(self, expanded, frontier, explored, start_time, max_time):
+        '''
+        This method is used to check the budgets of a search. It returns
+        the budget that ran out, or None
+        '''
+        if self.max_expansions is not None and expanded >= self.max_expansions:
+            return 'expansions'
+        if max_time is not None and time.time() - start_time >= max_time:
+            return 'time'
+        if self.max_memory is not None and len(frontier) + len(explored) >= self.max_memory:
+            return 'memory'
+        return None
+
+    def finish(self, actions, status, budget, expanded, frontier, explored, start_time):
+        '''
+        This method is used to build the result of a search, which is
+        also kept in self.result
+        '''
+        weight = self.weight if self.search_type in ('Astar', 'UCS') and status == 'solved' else None
+        self.result = SearchResult(actions, status, budget, expanded, len(frontier),
+                                   len(explored), time.time() - start_time, weight)
+        return self.result
+
 class LazySearchProblem:
     '''
     This class is used to create a search problem to check that our
@@ -0,0 +1,200 @@
+from my_search import GenericSearch, Frontier, Node
+from util import PriorityQueue
+import layout
+import pacman
+import searchAgents
+import unittest
+
+
+class GraphProblem:
+    '''A search problem on a graph given as {state: [(successor, cost)]}. The
+       action of an edge is the name of the state it leads to'''
+    def __init__(self, edges, start, goal, h=None):
+        self.edges = edges
+        self.start = start
+        self.goal  = goal
+        self.h     = h or {}
+
+    def getStartState(self):
+        return self.start
+
+    def isGoalState(self, s):
+        return s == self.goal
+
+    def getSuccessors(self, s):
+        return [(t, t, c) for t, c in self.edges.get(s, [])]
+
+def graph_heuristic(s, problem):
+    return problem.h.get(s, 0)
+
+class GridProblem:
+    '''An open n x n grid from one corner to the other'''
+    def __init__(self, n):
+        self.n = n
+
+    def getStartState(self):
+        return (0, 0)
+
+    def isGoalState(self, s):
+        return s == (self.n - 1, self.n - 1)
+
+    def getSuccessors(self, s):
+        x, y = s
+        return [((x + dx, y + dy), a, 1) for dx, dy, a in [(0, 1, 'N'), (0, -1, 'S'), (1, 0, 'E'), (-1, 0, 'W')]
+                if 0 <= x + dx < self.n and 0 <= y + dy < self.n]
+
+def maze_problem(name):
+    lay = layout.getLayout(name)
+    state = pacman.GameState()
+    state.initialize(lay, 0)
+    return searchAgents.PositionSearchProblem(state, warn=False)
+
+
+class TestPriorityQueue(unittest.TestCase):
+
+    def test_update(self):
+        q = PriorityQueue()
+        self.assertTrue(q.update('a', 5))
+        self.assertTrue(q.update('b', 3))
+        # A higher priority does not replace the queued one, a lower one does
+        self.assertFalse(q.update('a', 6))
+        self.assertFalse(q.update('b', 3))
+        self.assertTrue(q.update('a', 1))
+        self.assertEqual((len(q), q.getPriority('a')), (2, 1))
+        self.assertEqual([q.pop(), q.pop()], ['a', 'b'])
+        self.assertTrue(q.isEmpty())
+        self.assertEqual(q.getPriority('a'), None)
+
+    def test_update_key(self):
+        # Items are queued under a key of their own, ties pop in push order
+        q = PriorityQueue()
+        q.update('x1', 2, 'x')
+        q.update('y1', 2, 'y')
+        q.update('x2', 2, 'x')
+        q.update('z1', 4, 'z')
+        q.update('z2', 2, 'z')
+        self.assertEqual([q.pop() for _ in range(len(q))], ['x1', 'y1', 'z2'])
+
+    def test_frontier(self):
+        f = Frontier('UCS')
+        root = Node('S', None, None, 0, 0)
+        self.assertTrue(f.push(Node('A', root, 'A', 5, 5), 5))
+        self.assertTrue(f.push(Node('B', root, 'B', 3, 3), 3))
+        self.assertFalse(f.push(Node('A', root, 'A', 7, 7), 7))
+        cheaper = Node('A', root, 'A', 2, 2)
+        self.assertTrue(f.push(cheaper, 2))
+        self.assertEqual(len(f), 2)
+        self.assertTrue('A' in f)
+        self.assertIs(f.pop(), cheaper)
+        self.assertFalse('A' in f)
+        # DFS and BFS keep the node that was queued first
+        f = Frontier('BFS')
+        self.assertTrue(f.push(Node('A', root, 'A', 5, 5)))
+        self.assertFalse(f.push(Node('A', root, 'A', 2, 2)))
+        self.assertEqual(f.pop().cost, 5)
+
+
+class TestGenericSearch(unittest.TestCase):
+
+    def test_decrease_key(self):
+        # B is reached for 5 from S and then for 2 through A before it is
+        # expanded, so the path goes through A
+        edges = {'S': [('B', 5), ('A', 1)], 'A': [('B', 1)], 'B': [('G', 1)]}
+        for s_type in ['UCS', 'Astar']:
+            r = GenericSearch(s_type).search(GraphProblem(edges, 'S', 'G'))
+            self.assertEqual(list(r), ['A', 'B', 'G'])
+            self.assertEqual((r.status, r.expanded, r.explored, r.frontier), ('solved', 4, 4, 0))
+
+    def test_budgets(self):
+        r = GenericSearch('BFS', max_expansions=10).search(GridProblem(50))
+        self.assertEqual((r.status, r.budget, r.expanded, list(r)), ('budget_exhausted', 'expansions', 10, []))
+        r = GenericSearch('BFS', max_time=0).search(GridProblem(50))
+        self.assertEqual((r.status, r.budget, r.expanded), ('budget_exhausted', 'time', 0))
+        r = GenericSearch('BFS', max_memory=20).search(GridProblem(50))
+        self.assertEqual((r.status, r.budget), ('budget_exhausted', 'memory'))
+        self.assertEqual(r.frontier + r.explored, 20)
+        # A budget that is not given is read from the class, None is no limit
+        default = GenericSearch.max_expansions
+        try:
+            GenericSearch.max_expansions = 7
+            self.assertEqual(GenericSearch('DFS').search(GridProblem(50)).expanded, 7)
+            self.assertEqual(GenericSearch('DFS', max_expansions=None).search(GridProblem(50)).status, 'solved')
+        finally:
+            GenericSearch.max_expansions = default
+        with self.assertRaises(TypeError):
+            GenericSearch('DFS', max_nodes=10)
+
+    def test_no_path(self):
+        edges = {'S': [('A', 1)], 'A': [('S', 1), ('B', 1)], 'G': [('S', 1)]}
+        for s_type in ['DFS', 'BFS', 'UCS', 'Astar']:
+            r = GenericSearch(s_type).search(GraphProblem(edges, 'S', 'G'))
+            self.assertEqual((r.status, r.budget, r.explored, list(r)), ('no_path', None, 3, []))
+        r = GenericSearch('Astar').anytime_search(GraphProblem(edges, 'S', 'G'))
+        self.assertEqual((r.status, list(r)), ('no_path', []))
+
+    def test_start_is_goal(self):
+        p = GraphProblem({'S': [('G', 1)]}, 'S', 'S')
+        for s_type in ['DFS', 'BFS', 'UCS', 'Astar']:
+            r = GenericSearch(s_type).search(p)
+            self.assertEqual((r.status, r.expanded, list(r)), ('solved', 1, []))
+        r = GenericSearch('Astar').anytime_search(p)
+        self.assertEqual((r.status, list(r)), ('solved', []))
+
+    def test_deep_path(self):
+        # The path of a node is built without recursion
+        n = 100000
+        edges = dict((k, [(k + 1, 1)]) for k in range(n))
+        r = GenericSearch('DFS').search(GraphProblem(edges, 0, n))
+        self.assertEqual(list(r), list(range(1, n + 1)))
+        self.assertEqual(Node('S', None, None, 0, 0).get_path_from_root(), [])
+
+
+class TestAnytimeSearch(unittest.TestCase):
+    # With a large weight the heuristic of A is far below its cost, so the
+    # first path goes through A for a cost of 11, the cheapest one through
+    # B and C costs 6
+    edges = {'S': [('A', 1), ('B', 2)], 'A': [('G', 10)], 'B': [('C', 2)], 'C': [('G', 2)]}
+    h     = {'S': 5, 'A': 1, 'B': 4, 'C': 2}
+
+    def assertBound(self, result, optimal):
+        # The cost of every path found is within the weight of its round
+        self.assertEqual(result.status, 'solved')
+        for _, cost, weight in result.improved:
+            self.assertLessEqual(cost, weight * optimal)
+        # The last round has a weight of 1, so its path is the cheapest one
+        self.assertEqual(result.improved[-1][1:], (optimal, 1.0))
+
+    def test_graph(self):
+        p = GraphProblem(self.edges, 'S', 'G', self.h)
+        r = GenericSearch('Astar', graph_heuristic).anytime_search(p, 5.0, 3.0, 0.5)
+        self.assertBound(r, 6)
+        self.assertEqual([(cost, weight) for _, cost, weight in r.improved],
+                         [(11, 3.0), (11, 2.5), (6, 2.0), (6, 1.5), (6, 1.0)])
+        self.assertEqual(list(r), ['B', 'C', 'G'])
+        self.assertEqual(r.weight, 1.0)
+        # G is reached but never expanded
+        self.assertEqual(r.explored, 4)
+
+    def test_maze(self):
+        p = maze_problem('mediumMaze')
+        optimal = len(GenericSearch('UCS').search(p))
+        r = GenericSearch('Astar', searchAgents.manhattanHeuristic).anytime_search(maze_problem('mediumMaze'), 5.0, 5.0, 1.0)
+        self.assertBound(r, optimal)
+        self.assertEqual([w for _, _, w in r.improved], [5.0, 4.0, 3.0, 2.0, 1.0])
+        self.assertEqual(len(r), optimal)
+        # States expanded again in a later round are counted once
+        self.assertLessEqual(r.explored, r.expanded)
+
+    def test_time_budget(self):
+        r = GenericSearch('Astar').anytime_search(GridProblem(400), 0.05)
+        self.assertEqual((r.status, r.budget), ('budget_exhausted', 'time'))
+        self.assertEqual(list(r), [])
+        self.assertLess(r.elapsed, 0.5)
+        self.assertGreater(r.expanded, 0)
+        # No time at all stops the search before the first expansion
+        p = GraphProblem(self.edges, 'S', 'G', self.h)
+        r = GenericSearch('Astar', graph_heuristic).anytime_search(p, 0.0)
+        self.assertEqual((r.status, r.budget, r.expanded), ('budget_exhausted', 'time', 0))
+
+if __name__ == '__main__':
+    unittest.main()
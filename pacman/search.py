@@ -9,6 +9,9 @@
 """
 In search.py, you will implement generic search algorithms which are called
 by Pacman agents (in searchAgents.py).
+
+The searches take the budgets of GenericSearch in my_search.py as keyword
+arguments (max_expansions, max_time and max_memory, None for no limit).
 """
 
 import util
@@ -67,7 +70,7 @@ def tinyMazeSearch(problem):
   w = Directions.WEST
   return  [s,s,w,s,w,w,s,w]
 
-def depthFirstSearch(problem):
+def depthFirstSearch(problem, **budgets):
   """
   Search the deepest nodes in the search tree first
   [2nd Edition: p 75, 3rd Edition: p 87]
@@ -86,11 +89,11 @@ def depthFirstSearch(problem):
   # Import my implementation of the search algorithm
   from my_search import GenericSearch
   # Create an instance of my search
-  s = GenericSearch('DFS')
+  s = GenericSearch('DFS', **budgets)
   # Return the results of the search function
   return s.search(problem)
 
-def breadthFirstSearch(problem):
+def breadthFirstSearch(problem, **budgets):
   """
   Search the shallowest nodes in the search tree first.
   [2nd Edition: p 73, 3rd Edition: p 82]
@@ -98,14 +101,18 @@ def breadthFirstSearch(problem):
   # Import my implementation of the search algorithm
   from my_search import GenericSearch
   # Create an instance of my search
-  s = GenericSearch('BFS')
+  s = GenericSearch('BFS', **budgets)
   # Return the results of the search function
   return s.search(problem)
 
-def uniformCostSearch(problem):
+def uniformCostSearch(problem, **budgets):
   "Search the node of least total cost first. "
-  "*** YOUR CODE HERE ***"
-  util.raiseNotDefined()
+  # Import my implementation of the search algorithm
+  from my_search import GenericSearch
+  # Create an instance of my search
+  s = GenericSearch('UCS', **budgets)
+  # Return the results of the search function
+  return s.search(problem)
 
 def nullHeuristic(state, problem=None):
   """
@@ -114,18 +121,45 @@ def nullHeuristic(state, problem=None):
   """
   return 0
 
-def aStarSearch(problem, heuristic=nullHeuristic):
+def aStarSearch(problem, heuristic=nullHeuristic, **budgets):
   "Search the node that has the lowest combined cost and heuristic first."
   # Import my implementation of the search algorithm
   from my_search import GenericSearch
-  # Create an instance of my search
-  s = GenericSearch('Astar')
+  # Create an instance of my search that uses the heuristic
+  s = GenericSearch('Astar', heuristic, **budgets)
+  # Return the results of the search function
+  return s.search(problem)
+
+def weightedAStarSearch(problem, heuristic=nullHeuristic, weight=2.0, **budgets):
+  """
+  A* with the heuristic multiplied by weight. Expands fewer nodes than A*
+  for a path that costs at most weight times the cheapest one.
+  """
+  # Import my implementation of the search algorithm
+  from my_search import GenericSearch
+  # Create an instance of my search that uses the weighted heuristic
+  s = GenericSearch('Astar', heuristic, weight=weight, **budgets)
   # Return the results of the search function
   return s.search(problem)
 
+def anytimeAStarSearch(problem, heuristic=nullHeuristic, timeLimit=1.0, **budgets):
+  """
+  Anytime A* (ARA*). Finds a path quickly with a large weight on the
+  heuristic and improves it for as long as timeLimit seconds allow. A
+  max_time budget takes the place of timeLimit.
+  """
+  # Import my implementation of the search algorithm
+  from my_search import GenericSearch
+  # Create an instance of my search that uses the heuristic
+  timeLimit = budgets.pop('max_time', timeLimit)
+  s = GenericSearch('Astar', heuristic, **budgets)
+  # Return the best path found within the time limit
+  return s.anytime_search(problem, timeLimit)
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
+wastar = weightedAStarSearch
+araStar = anytimeAStarSearch
 ucs = uniformCostSearch
@@ -63,19 +63,32 @@ class SearchAgent(Agent):
     breadthFirstSearch or bfs
 
 
+  The budgets of the search can be given as maxExpansions, maxTime (seconds)
+  and maxMemory, 'None' for no limit, e.g. -a fn=bfs,maxExpansions=5000.  A
+  search that stops without a path raises an exception, which ends the game.
+
   Note: You should NOT change any code in SearchAgent
   """
 
-  def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+  def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic',
+               maxExpansions=None, maxTime=None, maxMemory=None):
     # Warning: some advanced Python magic is employed below to find the right functions and problems
 
+    # Budgets given with -a arrive as strings
+    budgets = {}
+    for name, value, kind in [('max_expansions', maxExpansions, int),
+                              ('max_time', maxTime, float),
+                              ('max_memory', maxMemory, int)]:
+      if value is not None:
+        budgets[name] = None if value == 'None' else kind(value)
+
     # Get the search function from the name and heuristic
     if fn not in dir(search):
       raise AttributeError(fn + ' is not a search function in search.py.')
     func = getattr(search, fn)
     if 'heuristic' not in func.__code__.co_varnames:
       print(('[SearchAgent] using function ' + fn))
-      self.searchFunction = func
+      self.searchFunction = lambda x: func(x, **budgets)
     else:
       if heuristic in dir(searchAgents):
         heur = getattr(searchAgents, heuristic)
@@ -85,7 +98,9 @@ class SearchAgent(Agent):
         raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
       print(('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic)))
       # Note: this bit of Python trickery combines the search algorithm and the heuristic
-      self.searchFunction = lambda x: func(x, heuristic=heur)
+      self.searchFunction = lambda x: func(x, heuristic=heur, **budgets)
+    if budgets:
+      print(('[SearchAgent] using budgets %s' % budgets))
 
     # Get the search problem type from the name
     if prob not in dir(searchAgents) or not prob.endswith('Problem'):
@@ -105,6 +120,12 @@ class SearchAgent(Agent):
     starttime = time.time()
     problem = self.searchType(state) # Makes a new search problem
     self.actions  = self.searchFunction(problem) # Find a path
+    # A search that stopped without a path has no actions to follow
+    status = getattr(self.actions, 'status', 'solved')
+    if status != 'solved':
+      stats = self.actions.stats()
+      raise Exception('Search stopped without a path (%s%s) after %d nodes expanded in %.1f seconds' %
+                      (status, ': ' + stats['budget'] if stats['budget'] else '', stats['expanded'], stats['elapsed']))
     totalCost = problem.getCostOfActions(self.actions)
     print(('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime)))
     if '_expanded' in dir(problem): print(('Search nodes expanded: %d' % problem._expanded))
@@ -58,24 +58,67 @@ class PriorityQueue:
     has a priority associated with it and the client is usually interested
     in quick retrieval of the lowest-priority item in the queue. This
     data structure allows O(1) access to the lowest-priority item.
+    Items of equal priority are popped in the order they were pushed.
 
-    Note that this PriorityQueue does not allow you to change the priority
-    of an item.  However, you may insert the same item multiple times with
-    different priorities.
+    push() may insert the same item multiple times with different
+    priorities. update() instead keeps a single entry per key and
+    lowers its priority (decrease-key) when the key is pushed again with a
+    lower priority. An entry that is replaced stays in the heap, marked as
+    removed, and is skipped when it comes to the top.
   """
   def  __init__(self):
-    self.heap = []
+    self.heap    = []
+    self.entries = {}   # key -> heap entry of the items pushed by update()
+    self.count   = 0    # number of entries ever pushed, breaks priority ties
+    self.size    = 0    # number of items in the queue
 
   def push(self, item, priority):
-      pair = (priority,item)
-      heapq.heappush(self.heap,pair)
+      entry = [priority, self.count, item, None]
+      self.count += 1
+      self.size  += 1
+      heapq.heappush(self.heap, entry)
+
+  def update(self, item, priority, key=None):
+      """
+        Push item under key (the item itself if key is None) unless the key
+        is already queued with a priority that is as low or lower. An entry
+        with a higher priority is replaced. Returns True if item was pushed
+      """
+      if key is None: key = item
+      old = self.entries.get(key)
+      if old is not None:
+        if old[0] <= priority: return False
+        old[2] = _removed
+        self.size -= 1
+      entry = [priority, self.count, item, key]
+      self.entries[key] = entry
+      self.count += 1
+      self.size  += 1
+      heapq.heappush(self.heap, entry)
+      return True
+
+  def getPriority(self, key):
+      "Returns the priority of a key queued by update(), or None"
+      entry = self.entries.get(key)
+      return entry[0] if entry is not None else None
 
   def pop(self):
-      (priority,item) = heapq.heappop(self.heap)
-      return item
+      while True:
+        entry = heapq.heappop(self.heap)
+        if entry[2] is not _removed: break
+      if entry[3] is not None and self.entries.get(entry[3]) is entry:
+        del self.entries[entry[3]]
+      self.size -= 1
+      return entry[2]
 
   def isEmpty(self):
-    return len(self.heap) == 0
+    return self.size == 0
+
+  def __len__(self):
+    return self.size
+
+# Marks an entry of a PriorityQueue that was replaced by update()
+_removed = object()
 
 class PriorityQueueWithFunction(PriorityQueue):
   """
@@ -1,66 +1,165 @@
-import sys, os, random, pygame
-sys.path.append(os.path.join("objects"))
+import sys, os, pygame
+
+# The objects and images are found next to this file, wherever it is run from
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, "objects"))
 import SudokuSquare
 from GameResources import *
 
 digits = '123456789'
 rows = 'ABCDEFGHI'
 
+size = width, height = 700, 700
+background_path = os.path.join(HERE, "images", "sudoku-board-bare.jpg")
 
-def play(values_list):
-    pygame.init()
 
+def square_position(x, y):
+    # The top left corner of the square in column x and row y
+    if x in (0, 1, 2):  startX = (x * 57) + 38
+    if x in (3, 4, 5):  startX = (x * 57) + 99
+    if x in (6, 7, 8):  startX = (x * 57) + 159
 
-    size = width, height = 700, 700
-    screen = pygame.display.set_mode(size)
+    if y in (0, 1, 2):  startY = (y * 57) + 35
+    if y in (3, 4, 5):  startY = (y * 57) + 100
+    if y in (6, 7, 8):  startY = (y * 57) + 165
+    return startX, startY
 
-    background_image = pygame.image.load("./images/sudoku-board-bare.jpg").convert()
 
-    clock = pygame.time.Clock()
+class Board:
+    """Draws boards onto the display surface. Only the squares whose number
+    changed since the last board are drawn again, over the background, and
+    every square is built once per number and reused."""
+    def __init__(self, screen):
+        self.screen = screen
+        self.background = pygame.image.load(background_path).convert()
+        self.squares = {}
+        self.shown = {}
+        screen.blit(self.background, (0, 0))
 
-    # The puzzleNumber sets a seed so either generate
-    # a random number to fill in here or accept user
-    # input for a duplicatable puzzle.
+    def square(self, x, y, number):
+        key = (x, y, number)
+        if key not in self.squares:
+            startX, startY = square_position(x, y)
+            self.squares[key] = SudokuSquare.SudokuSquare(number, startX, startY, "N", x, y)
+        return self.squares[key]
 
-    for values in values_list:
-        pygame.event.pump()
-        theSquares = []
-        initXLoc = 0
-        initYLoc = 0
-        startX, startY, editable, number = 0, 0, "N", 0
+    def draw(self, values):
+        """Draw a board given in dictionary form. Returns the rectangles of the
+        screen that changed"""
+        changed = []
         for y in range(9):
             for x in range(9):
-                if x in (0, 1, 2):  startX = (x * 57) + 38
-                if x in (3, 4, 5):  startX = (x * 57) + 99
-                if x in (6, 7, 8):  startX = (x * 57) + 159
-
-                if y in (0, 1, 2):  startY = (y * 57) + 35
-                if y in (3, 4, 5):  startY = (y * 57) + 100
-                if y in (6, 7, 8):  startY = (y * 57) + 165
-                col = digits[x]
-                row = rows[y]
-                string_number = values[row + col]
+                string_number = values[rows[y] + digits[x]]
                 if len(string_number) > 1 or string_number == '' or string_number == '.':
                     number = None
                 else:
                     number = int(string_number)
-                theSquares.append(SudokuSquare.SudokuSquare(number, startX, startY, editable, x, y))
+                if (x, y) in self.shown and self.shown[(x, y)] == number:
+                    continue
+                self.shown[(x, y)] = number
+                rect = pygame.Rect(square_position(x, y), (45, 40))
+                self.screen.blit(self.background, rect, rect)
+                self.square(x, y, number).draw()
+                changed.append(rect)
+        return changed
 
-        screen.blit(background_image, (0, 0))
-        for num in theSquares:
-            num.draw()
 
-        pygame.display.flip()
-        pygame.display.update()
-        clock.tick(5)
+def play(values_list, fps=5, wait=True):
+    pygame.init()
+
+    screen = pygame.display.set_mode(size)
+    board = Board(screen)
+    pygame.display.flip()
+
+    clock = pygame.time.Clock()
+
+    for values in values_list:
+        pygame.event.pump()
+        pygame.display.update(board.draw(values))
+        clock.tick(fps)
 
     # leave game showing until closed by user
-    while True:
+    while wait:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
+                wait = False
+    pygame.quit()
+
+
+class GifWriter:
+    """Writes the frames of a GIF one at a time, so a long replay is never
+    held in memory. Every frame after the first only holds the part of the
+    screen that changed, a board without changes is a frame of the single
+    unchanged top left pixel so that it is still shown for its duration.
+    Requires Pillow."""
+    def __init__(self, path, screen, duration):
+        from PIL import Image, GifImagePlugin
+        self.Image = Image
+        self.GifImagePlugin = GifImagePlugin
+        self.duration = duration
+        self.file = open(path, 'wb')
+        # The colors of the first frame are used by all frames
+        first = self.image(screen, screen.get_rect()).quantize(256, dither=Image.Dither.NONE)
+        self.palette = first
+        header, _ = GifImagePlugin.getheader(first, info={'duration': duration})
+        for s in header:
+            self.file.write(s)
+        self.write(first, (0, 0))
+
+    def image(self, screen, rect):
+        return self.Image.frombytes('RGB', rect.size, pygame.image.tobytes(screen.subsurface(rect), 'RGB'))
+
+    def write(self, im, offset):
+        for s in self.GifImagePlugin.getdata(im, offset, duration=self.duration):
+            self.file.write(s)
+
+    def add(self, screen, rects):
+        if rects:
+            rect = rects[0].unionall(rects[1:])
+        else:
+            rect = pygame.Rect(0, 0, 1, 1)
+        im = self.image(screen, rect).quantize(palette=self.palette, dither=self.Image.Dither.NONE)
+        self.write(im, rect.topleft)
+
+    def close(self):
+        self.file.write(b';')
+        self.file.close()
 
-if __name__ == "__main__":
-    main()
-    sys.exit()
\ No newline at end of file
+
+def save_png(screen, path):
+    # Pillow writes a PNG several times faster than pygame with its fastest
+    # compression, pygame is used if Pillow is not installed
+    try:
+        from PIL import Image
+    except ImportError:
+        pygame.image.save(screen, path)
+        return
+    Image.frombytes('RGB', size, pygame.image.tobytes(screen, 'RGB')).save(path, compress_level=1)
+
+
+def render(values_list, path, fps=5):
+    """Render boards without a window. If path ends with .gif an animated GIF
+    is written, otherwise path is a pattern like 'frame%04d.png' for a PNG
+    per board. Returns the number of boards rendered"""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    board = Board(screen)
+    gif = None
+    count = 0
+    try:
+        for values in values_list:
+            rects = board.draw(values)
+            if path.lower().endswith('.gif'):
+                if gif is None:
+                    gif = GifWriter(path, screen, int(1000 / fps))
+                else:
+                    gif.add(screen, rects)
+            else:
+                save_png(screen, path % count)
+            count += 1
+    finally:
+        if gif is not None:
+            gif.close()
+        pygame.quit()
+    return count
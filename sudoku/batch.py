@@ -0,0 +1,153 @@
+# Imports
+import sys
+import json
+import time
+import argparse
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+from sudoku import Sudoku
+from cache import SolveCache
+from stats import SolveStats
+from stream import PuzzleReader, SolutionWriter
+
+# The solver used by the current process. Every worker process of the pool
+# creates its own solver once when it starts, and its own solution cache if
+# one is asked for
+solver = None
+cache  = None
+
+def init_solver(is_diag, size=3, cache_size=0, stats=False):
+    """
+    Create the solver of the current process and a cache of up to cache_size
+    solutions (no cache if cache_size is 0). If stats is True the solver
+    counts its work
+    """
+    global solver, cache
+    solver = Sudoku(is_diag, size=size)
+    cache  = SolveCache(solver, cache_size) if cache_size else None
+    if stats:
+        solver.stats = SolveStats()
+
+def solve_line(line):
+    """
+    Solve a single puzzle given as a line of one character per box (81 for
+    a 9x9 board) where a blank box is either '.' or '0'. Returns the solution
+    as a line of digits or an empty line if the puzzle has no solution or
+    the line is not a puzzle
+    """
+    try:
+        b = solver.grid_bits(line)
+    except ValueError:
+        return ''
+    if cache is not None:
+        return cache.lookup(line)
+    b = solver.search_bits(b)
+    if b == False:
+        return ''
+    return solver.bits_grid(b)
+
+def solve_line_stats(line):
+    """
+    Same as solve_line() but also returns the report of the work done by the
+    solver for this puzzle
+    """
+    solver.stats.clear()
+    return solve_line(line), solver.stats.report()
+
+def read_puzzles(f):
+    """
+    Generator over the puzzles in a file, one puzzle per line. Empty lines
+    and lines starting with '#' are skipped
+    """
+    for line in f:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+def solve_batch(puzzles, is_diag=0, workers=None, chunk_size=64, size=3, cache_size=0, window=4, stats=None):
+    """
+    Generator over the solutions of an iterable of puzzles. The puzzles are
+    solved by a pool of worker processes, chunk_size puzzles at a time, and
+    the solutions are returned in the same order as the puzzles. If workers
+    is 1 then the puzzles are solved in the current process. With a
+    cache_size every process keeps a cache of the solutions it has found,
+    which pays off if many puzzles are repeats or symmetries of each other.
+    The puzzles are read workers * chunk_size * window at a time and the next
+    batch is queued while the solutions of the current one are returned, so
+    a large input is never read into memory as a whole. If stats is a
+    SolveStats then the work done for every puzzle is added to it
+    """
+    solve = solve_line if stats is None else solve_line_stats
+    def results(solutions):
+        for solution in solutions:
+            if stats is not None:
+                solution, report = solution
+                stats.merge(report)
+            yield solution
+    if workers == 1:
+        init_solver(is_diag, size, cache_size, stats is not None)
+        for solution in results(solve(line) for line in puzzles):
+            yield solution
+        return
+    puzzles = iter(puzzles)
+    size_w  = (workers or cpu_count()) * chunk_size * window
+    with Pool(workers, initializer=init_solver, initargs=(is_diag, size, cache_size, stats is not None)) as pool:
+        lines   = list(islice(puzzles, size_w))
+        running = pool.imap(solve, lines, chunk_size) if lines else None
+        while running is not None:
+            lines   = list(islice(puzzles, size_w))
+            queued  = pool.imap(solve, lines, chunk_size) if lines else None
+            for solution in results(running):
+                yield solution
+            running = queued
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a file of sudoku puzzles, one puzzle per line (81 characters for a 9x9 board).')
+    parser.add_argument('input', nargs='?', default='-', help='file with puzzles, - for stdin (default)')
+    parser.add_argument('-o', '--output', default='-', help='file for the solutions, - for stdout (default)')
+    parser.add_argument('-d', '--diag', action='store_true', help='solve diagonal sudokus')
+    parser.add_argument('-s', '--size', type=int, default=3, help='size of a square, 4 for 16x16 and 5 for 25x25 boards (default: 3)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per cpu)')
+    parser.add_argument('-c', '--chunk-size', type=int, default=64, help='puzzles sent to a worker at a time (default: 64)')
+    parser.add_argument('-k', '--cache-size', type=int, default=0, help='solutions cached by every worker (default: 0, no cache)')
+    parser.add_argument('--stats', action='store_true', help='write the work done by the solvers as JSON to stderr')
+    args = parser.parse_args(argv)
+
+    # The input is memory mapped if it is a file and the solutions are
+    # written many lines at a time
+    is_diag = 1 if args.diag else 0
+    f_in   = sys.stdin  if args.input  == '-' else open(args.input, 'rb')
+    f_out  = sys.stdout if args.output == '-' else open(args.output, 'wb')
+    reader = PuzzleReader(f_in, is_diag, args.size)
+    writer = SolutionWriter(f_out, is_diag, args.size)
+    count  = 0
+    solved = 0
+    stats  = SolveStats() if args.stats else None
+    start  = time.time()
+    try:
+        for solution in solve_batch(reader.lines(), is_diag, args.workers, args.chunk_size,
+                                    args.size, args.cache_size, stats=stats):
+            writer.write(solution)
+            count += 1
+            if solution:
+                solved += 1
+        writer.flush()
+    finally:
+        if f_in is not sys.stdin:
+            f_in.close()
+        if f_out is not sys.stdout:
+            f_out.close()
+    elapsed = time.time() - start
+    for n, error in reader.errors:
+        sys.stderr.write('%s: line %d: %s\n' % (args.input, n, error))
+    # Malformed lines and puzzles without a solution both give an empty line
+    malformed = len(reader.errors)
+    sys.stderr.write('Solved %d of %d puzzles in %.2fs (%.1f puzzles/sec), %d without a solution, %d malformed\n' %
+                     (solved, count, elapsed, count / elapsed if elapsed else 0.0, count - solved - malformed, malformed))
+    if stats is not None:
+        json.dump(stats.report(), sys.stderr, indent=2, sort_keys=True)
+        sys.stderr.write('\n')
+
+# Main
+if __name__ == '__main__':
+    main()
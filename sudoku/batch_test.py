@@ -0,0 +1,58 @@
+import batch
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+
+class TestBatch(unittest.TestCase):
+    puzzles = ['4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+               '003020600900305001001806400008102900700000008006708200002609500800203009005010300',
+               '11' + '.'*79]
+
+    def test_order_and_workers(self):
+        single = list(batch.solve_batch(self.puzzles, workers=1))
+        self.assertEqual(single[2], '')
+        self.assertTrue(single[1].startswith('483921657'))
+        self.assertEqual(list(batch.solve_batch(self.puzzles*4, workers=2, chunk_size=1)), single*4)
+
+    def test_bad_line(self):
+        puzzles = ['1..', self.puzzles[0], self.puzzles[0] + '5']
+        solutions = list(batch.solve_batch(puzzles, workers=2, chunk_size=1))
+        self.assertEqual(solutions[0], '')
+        self.assertEqual(solutions[2], '')
+        self.assertTrue(solutions[1].startswith('417369825'))
+
+    def test_bounded_input(self):
+        # The pool reads at most two windows of puzzles ahead of the solutions
+        read = []
+        def puzzles():
+            for i in range(200):
+                read.append(i)
+                yield self.puzzles[1]
+        solutions = batch.solve_batch(puzzles(), workers=2, chunk_size=2, window=3)
+        next(solutions)
+        self.assertTrue(len(read) <= 2 * 2*2*3 + 1)
+        self.assertEqual(len(list(solutions)), 199)
+
+    def test_summary(self):
+        # Malformed lines and puzzles without a solution are not counted as
+        # solved
+        d = tempfile.mkdtemp()
+        with open(os.path.join(d, 'in.txt'), 'w') as f:
+            f.write('\n'.join(self.puzzles + ['1..']) + '\n')
+        err = io.StringIO()
+        with redirect_stderr(err):
+            batch.main([os.path.join(d, 'in.txt'), '-o', os.path.join(d, 'out.txt'), '-w', '1'])
+        self.assertIn('line 4: a puzzle needs 81 characters, not 3', err.getvalue())
+        self.assertIn('Solved 2 of 4 puzzles', err.getvalue())
+        self.assertIn('1 without a solution, 1 malformed', err.getvalue())
+
+    def test_diagonal(self):
+        grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+        solution = list(batch.solve_batch([grid], is_diag=1, workers=1))[0]
+        self.assertTrue(solution.startswith('267945381'))
+
+if __name__ == '__main__':
+    unittest.main()
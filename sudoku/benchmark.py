@@ -0,0 +1,125 @@
+# Imports
+import os
+import sys
+import json
+import math
+import time
+import platform
+import argparse
+from sudoku import Sudoku
+from batch import read_puzzles
+
+# Directory of the bundled puzzle sets. A set whose name starts with 'diag'
+# holds diagonal sudokus
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'puzzles')
+
+# The propagation phases timed by the benchmark, in the order they are run
+PHASES = ['eliminate', 'only_choice', 'naked_twins']
+
+def percentile(values, p):
+    """
+    The p-th percentile (nearest rank) of a list of values
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = max(0, min(len(values)-1, int(math.ceil(p / 100.0 * len(values))) - 1))
+    return values[k]
+
+def load_set(name):
+    """
+    Return the puzzles of a bundled puzzle set
+    """
+    with open(os.path.join(PUZZLE_DIR, name + '.txt')) as f:
+        return list(read_puzzles(f))
+
+def bundled_sets():
+    """
+    Return the names of the bundled puzzle sets
+    """
+    return sorted(f[:-4] for f in os.listdir(PUZZLE_DIR) if f.endswith('.txt'))
+
+def run_puzzle(s, grid, form):
+    """
+    Solve a single puzzle and time each phase. The propagation phases are run
+    one after another until none of them changes the board, then the search
+    solves what is left. form is 'dict' or 'bits' and selects the board form
+    the phases work on. Returns a dictionary with the results
+    """
+    timer = time.perf_counter
+    times = dict((p, 0.0) for p in PHASES)
+    if form == 'dict':
+        board = s.grid_values(grid)
+        fns   = [getattr(s, p) for p in PHASES]
+        count = lambda board: len([v for v in board.values() if len(v) == 1])
+    else:
+        board = s.grid_bits(grid)
+        fns   = [getattr(s, p + '_bits') for p in PHASES]
+        count = lambda board: len([m for m in board if m and not m & (m-1)])
+
+    start = timer()
+    stalled = False
+    while not stalled:
+        before = count(board)
+        for p, fn in zip(PHASES, fns):
+            t = timer()
+            board = fn(board)
+            times[p] += timer() - t
+        stalled = count(board) == before
+
+    t = timer()
+    board = s.search(board)
+    times['search'] = timer() - t
+    return {'solved':  board != False,
+            'nodes':   s.nodes,
+            'latency': timer() - start,
+            'phases':  times}
+
+def run_set(name, puzzles, form='bits', repeat=1, backend='propagate'):
+    """
+    Run the benchmark over a list of puzzles. Returns a summary with the total
+    time per phase, the nodes expanded by the search and the latency
+    percentiles in milliseconds
+    """
+    s = Sudoku(1 if name.startswith('diag') else 0, backend)
+    results = [run_puzzle(s, g, form) for _ in range(repeat) for g in puzzles]
+    latency = [r['latency'] * 1000.0 for r in results]
+    nodes   = [r['nodes'] for r in results]
+    return {'puzzles':   len(results),
+            'solved':    len([r for r in results if r['solved']]),
+            'phases_ms': dict((p, sum(r['phases'][p] for r in results) * 1000.0) for p in PHASES + ['search']),
+            'nodes':     {'total': sum(nodes), 'mean': sum(nodes) / float(len(nodes)), 'max': max(nodes)},
+            'latency_ms': {'total': sum(latency),
+                           'mean':  sum(latency) / len(latency),
+                           'p50':   percentile(latency, 50),
+                           'p99':   percentile(latency, 99),
+                           'max':   max(latency)}}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the sudoku solver on the bundled puzzle sets.')
+    parser.add_argument('sets', nargs='*', help='puzzle sets to run (default: all of %s)' % ', '.join(bundled_sets()))
+    parser.add_argument('-f', '--form', choices=['dict', 'bits'], default='bits', help='board form used by the propagation phases (default: bits)')
+    parser.add_argument('-b', '--backend', choices=Sudoku.backends, default='propagate', help='search backend (default: propagate)')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='number of times each puzzle is solved (default: 1)')
+    parser.add_argument('-o', '--output', default='-', help='file for the JSON results, - for stdout (default)')
+    args = parser.parse_args(argv)
+
+    report = {'form':    args.form,
+              'backend': args.backend,
+              'python':  platform.python_version(),
+              'machine': platform.machine(),
+              'sets':    {}}
+    for name in args.sets or bundled_sets():
+        report['sets'][name] = run_set(name, load_set(name), args.form, args.repeat, args.backend)
+        sys.stderr.write('%-10s p50 %8.3fms  p99 %8.3fms\n' % (name, report['sets'][name]['latency_ms']['p50'], report['sets'][name]['latency_ms']['p99']))
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+# Main
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import benchmark
+import unittest
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([3.0], 99), 3.0)
+
+    def test_bundled_sets(self):
+        for name in benchmark.bundled_sets():
+            self.assertTrue(len(benchmark.load_set(name)) > 0)
+            for g in benchmark.load_set(name):
+                self.assertEqual(len(g), 81)
+
+    def test_run_set(self):
+        for form in ['dict', 'bits']:
+            for name in ['hardest', 'diag']:
+                r = benchmark.run_set(name, benchmark.load_set(name)[:3], form)
+                self.assertEqual(r['solved'], 3)
+                self.assertEqual(sorted(r['phases_ms']), ['eliminate', 'naked_twins', 'only_choice', 'search'])
+                self.assertTrue(r['latency_ms']['p50'] <= r['latency_ms']['p99'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+# Imports
+import os
+import json
+from collections import OrderedDict
+from itertools import islice, permutations, product
+from operator import itemgetter
+
+class SolveCache:
+    '''A bounded LRU cache of solutions in front of Sudoku.solve().
+
+       Puzzles that are the same up to a symmetry of the sudoku share a single
+       entry. Every puzzle is brought into a canonical form first: the smallest
+       grid string over the symmetries tried, with the digits relabelled in
+       the order they first appear. The solution of the canonical form is
+       cached and mapped back through the inverse symmetry.
+
+       A standard sudoku may be transposed, its bands and stacks reordered and
+       the rows (columns) within a band (stack) reordered. Only the orders that
+       sort the lines by their clue counts are tried. Lines with the same
+       counts are tried in every order, up to limit candidates in total.
+       A diagonal sudoku only allows the symmetries that map the two
+       diagonals onto the diagonals: a transposition and the same mirrored
+       order of the rows and columns, or the mirrored order of the rows and
+       its reverse for the columns, which swaps the diagonals.
+
+       Past the limit, two forms of the same puzzle can get different keys.
+       That costs a cache miss but never gives a wrong solution.
+    '''
+    def __init__(self, s, max_size=4096, path=None, limit=256):
+        self.solver   = s
+        self.max_size = max_size
+        self.path     = path
+        self.limit    = limit
+        self.n        = len(s.digits)
+        self.entries  = OrderedDict()
+        self.hits     = 0
+        self.misses   = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def solve(self, grid):
+        '''
+        Same as Sudoku.solve() but looks the solution up in the cache first.
+        Boards in dictionary or bitmask form are only cached if every box is
+        either a given or blank
+        '''
+        s = self.solver
+        if isinstance(grid, str):
+            line = self.lookup(grid)
+            return s.grid_values(line) if line else False
+        b = s.board_bits(grid)
+        if any(m & (m-1) and m != s.all_bits for m in b):
+            return s.solve(grid)
+        line = self.lookup(s.bits_grid(b))
+        if not line:
+            return False
+        if isinstance(grid, list):
+            grid[:] = s.grid_bits(line)
+            return grid
+        return s.grid_values(line)
+
+    def lookup(self, grid):
+        '''
+        Return the solution of a puzzle given as a line of one character per
+        box, '.' or '0' for a blank box, as a line of digits. Returns an empty
+        line if the puzzle has no solution and raises ValueError if the line
+        is not a puzzle
+        '''
+        s = self.solver
+        s.check_grid(grid)
+        grid = grid.replace('0', '.')
+        key, src, order = self.canonical(grid)
+        solution = self.entries.get(key)
+        if solution is None:
+            self.misses += 1
+            b = s.search_bits(s.grid_bits(key))
+            solution = s.bits_grid(b) if b != False else ''
+            self.entries[key] = solution
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        if not solution:
+            return ''
+        # Undo the relabelling and put every box back in its place
+        solution = solution.translate(str.maketrans(s.digits, order))
+        out = [None] * len(solution)
+        for j, i in enumerate(src):
+            out[i] = solution[j]
+        return ''.join(out)
+
+    def canonical(self, grid):
+        '''
+        Return the canonical form of a puzzle given as a line of one character
+        per box, together with the box of the puzzle each box of the canonical
+        form comes from and the digits of the puzzle in the order of the
+        canonical digits
+        '''
+        n      = self.n
+        digits = self.solver.digits
+        best   = None
+        lines  = [self.lines(grid, 0), self.lines(grid, 1)]
+        for t, rp, cp in islice(self.candidates(grid), self.limit):
+            rows = lines[t]
+            get  = itemgetter(*cp)
+            g    = ''.join(''.join(get(rows[r])) for r in rp)
+            seen = ''.join(c for c in dict.fromkeys(g) if c != '.')
+            g    = g.translate(str.maketrans(seen, digits[:len(seen)]))
+            if best is None or g < best[0]:
+                best = (g, t, rp, cp, seen)
+        g, t, rp, cp, seen = best
+        if t:
+            src = [cp[c]*n + rp[r] for r in range(n) for c in range(n)]
+        else:
+            src = [rp[r]*n + cp[c] for r in range(n) for c in range(n)]
+        order = seen + ''.join(d for d in digits if d not in seen)
+        return g, src, order
+
+    def lines(self, grid, t):
+        # The rows of the grid, or its columns if it is transposed
+        n = self.n
+        if t:
+            return [grid[c::n] for c in range(n)]
+        return [grid[r*n:r*n+n] for r in range(n)]
+
+    def candidates(self, grid):
+        # Every symmetry tried by canonical() as a tuple of the transposition
+        # and the orders of the rows and the columns
+        k = self.solver.size
+        if self.solver.is_diag:
+            rev = self.n - 1
+            for t in (0, 1):
+                for rp in mirror_lines(k):
+                    yield t, rp, rp
+                    yield t, rp, tuple(rev - r for r in rp)
+            return
+        for t in (0, 1):
+            rows = self.lines(grid, t)
+            cols = self.lines(grid, 1 - t)
+            row_counts = [len(r) - r.count('.') for r in rows]
+            col_counts = [len(c) - c.count('.') for c in cols]
+            # A line is known by its clue count and the counts of the crossing
+            # lines of its clues, neither changes with the order of the lines
+            row_keys = [(row_counts[r], sorted(col_counts[c] for c, v in enumerate(line) if v != '.'))
+                        for r, line in enumerate(rows)]
+            col_keys = [(col_counts[c], sorted(row_counts[r] for r, v in enumerate(line) if v != '.'))
+                        for c, line in enumerate(cols)]
+            for rp, cp in product(sorted_lines(row_keys, k), sorted_lines(col_keys, k)):
+                yield t, rp, cp
+
+    def load(self, path):
+        '''
+        Add the solutions saved in a file by save()
+        '''
+        with open(path) as f:
+            data = json.load(f)
+        if data['is_diag'] != self.solver.is_diag or data['size'] != self.solver.size:
+            raise ValueError('%s holds solutions of another sudoku variant' % path)
+        for key, solution in data['solutions']:
+            self.entries[key] = solution
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def save(self, path=None):
+        '''
+        Save the cached solutions to a file, by default the file the cache was
+        created with. The file is replaced in a single step
+        '''
+        path = path or self.path
+        data = {'is_diag':   self.solver.is_diag,
+                'size':      self.solver.size,
+                'solutions': list(self.entries.items())}
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(path + '.tmp', path)
+
+def tied_orders(items, key):
+    '''
+    Generator over every order of items that is sorted by key, i.e. every
+    order of the items with the same key
+    '''
+    items  = sorted(items, key=key)
+    groups = []
+    for i in items:
+        if groups and key(groups[-1][0]) == key(i):
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    for order in product(*(permutations(g) for g in groups)):
+        yield tuple(i for g in order for i in g)
+
+def sorted_lines(keys, k):
+    '''
+    Generator over every order of the rows (or columns) of a board with bands
+    of k lines that sorts the bands and the lines within every band by key
+    '''
+    band_key = lambda b: sorted(keys[b*k:b*k+k])
+    for bands in tied_orders(range(k), band_key):
+        within = [tied_orders(range(b*k, b*k+k), keys.__getitem__) for b in bands]
+        for order in product(*[list(w) for w in within]):
+            yield tuple(i for o in order for i in o)
+
+def mirror_orders(k):
+    '''
+    Generator over the orders of range(k) that are not changed by reversing
+    both the order and range(k)
+    '''
+    pairs = [(i, k-1-i) for i in range(k // 2)]
+    for p in permutations(pairs):
+        for flips in product((0, 1), repeat=len(pairs)):
+            o = list(range(k))
+            for i, ((a, b), f) in enumerate(zip(p, flips)):
+                o[i], o[k-1-i] = (b, a) if f else (a, b)
+            yield tuple(o)
+
+def mirror_lines(k):
+    '''
+    Generator over the orders of the rows of a board with bands of k lines
+    that keep the bands together and map mirrored rows onto mirrored rows, so
+    that the diagonals of a diagonal sudoku stay diagonals
+    '''
+    for bands in mirror_orders(k):
+        # The rows of the top half of the bands are ordered freely and the
+        # mirrored bands follow, the middle band of an odd k is mirrored itself
+        halves = [list(permutations(range(k)))] * (k // 2)
+        middle = [list(mirror_orders(k))] if k % 2 else []
+        for orders in product(*(halves + middle)):
+            within = [None] * k
+            for i in range(k // 2):
+                within[i]     = orders[i]
+                within[k-1-i] = tuple(k-1-j for j in reversed(orders[i]))
+            if k % 2:
+                within[k // 2] = orders[-1]
+            yield tuple(bands[i]*k + j for i in range(k) for j in within[i])
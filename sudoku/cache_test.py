@@ -0,0 +1,105 @@
+from sudoku import Sudoku
+from cache import SolveCache, mirror_lines
+import sudoku_test
+import batch
+import os
+import random
+import tempfile
+import unittest
+
+
+def transform(grid, rows, cols, t, digits):
+    # The grid with its rows and columns reordered, transposed if t and its
+    # digits relabelled
+    n = len(rows)
+    if t:
+        grid = ''.join(grid[c*n + r] for r in range(n) for c in range(n))
+    grid = ''.join(grid[rows[r]*n + cols[c]] for r in range(n) for c in range(n))
+    return grid.translate(str.maketrans('123456789', digits))
+
+def band_order(rng):
+    # A random order of the rows of a board that keeps the bands together
+    bands = rng.sample(range(3), 3)
+    return [b*3 + r for b in bands for r in rng.sample(range(3), 3)]
+
+
+class TestSolveCache(unittest.TestCase):
+    grids = ['4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+             '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.']
+    diag_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def assertSolution(self, s, grid, solution):
+        self.assertEqual(solution, s.bits_grid(s.solve(s.grid_bits(grid))))
+
+    def test_symmetries(self):
+        rng = random.Random(1)
+        s = Sudoku()
+        c = SolveCache(s)
+        for g in self.grids:
+            for _ in range(5):
+                h = transform(g, band_order(rng), band_order(rng), rng.randint(0, 1), ''.join(rng.sample('123456789', 9)))
+                self.assertEqual(c.canonical(h)[0], c.canonical(g)[0])
+                self.assertSolution(s, h, c.lookup(h))
+        self.assertEqual((c.misses, c.hits), (len(self.grids), 4*len(self.grids)))
+
+    def test_diagonal(self):
+        rng = random.Random(2)
+        s = Sudoku(1)
+        c = SolveCache(s)
+        orders = list(mirror_lines(3))
+        self.assertEqual(len(orders), 24)
+        for rows in orders[:8]:
+            cols = rows if rng.randint(0, 1) else [8 - r for r in rows]
+            h = transform(self.diag_grid, rows, cols, rng.randint(0, 1), ''.join(rng.sample('123456789', 9)))
+            self.assertSolution(s, h, c.lookup(h))
+        self.assertEqual(c.misses, 1)
+        # Swapping two rows is a symmetry of a standard sudoku only
+        h = transform(self.diag_grid, [1, 0] + list(range(2, 9)), list(range(9)), 0, '123456789')
+        self.assertNotEqual(c.canonical(h)[0], c.canonical(self.diag_grid)[0])
+        sudoku_test.TestSearch.assertSolves(self, s, h, c.solve(h))
+
+    def test_forms(self):
+        s = Sudoku()
+        c = SolveCache(s)
+        g = self.grids[0]
+        self.assertEqual(c.solve(g), s.solve(g))
+        self.assertEqual(c.solve(s.grid_values(g)), s.solve(g))
+        self.assertEqual(c.solve(s.grid_bits(g)), s.solve(s.grid_bits(g)))
+        self.assertEqual(c.solve('11' + '.'*79), False)
+        self.assertEqual(c.solve('11' + '.'*79), False)
+        self.assertEqual(c.hits, 3)
+
+    def test_invalid(self):
+        s = Sudoku()
+        c = SolveCache(s)
+        g = self.grids[0]
+        self.assertEqual(c.solve(g.replace('.', '0')), s.solve(g))
+        self.assertEqual(c.hits, 0)
+        self.assertEqual(c.lookup(g), c.lookup(g.replace('.', '0')))
+        for bad in ['', g[:-1], g + '.', g[:-1] + 'x']:
+            with self.assertRaises(ValueError):
+                c.lookup(bad)
+        self.assertEqual(len(c.entries), 1)
+
+    def test_lru_and_save(self):
+        s = Sudoku()
+        c = SolveCache(s, max_size=1)
+        for g in self.grids + self.grids[:1]:
+            c.lookup(g)
+        self.assertEqual((c.misses, len(c.entries)), (3, 1))
+        path = os.path.join(tempfile.mkdtemp(), 'cache.json')
+        c.save(path)
+        c = SolveCache(s, path=path)
+        self.assertSolution(s, self.grids[0], c.lookup(self.grids[0]))
+        self.assertEqual(c.hits, 1)
+        with self.assertRaises(ValueError):
+            SolveCache(Sudoku(1), path=path)
+
+    def test_batch(self):
+        puzzles = self.grids*2 + ['11' + '.'*79]
+        solutions = list(batch.solve_batch(puzzles, workers=1))
+        self.assertEqual(list(batch.solve_batch(puzzles, workers=1, cache_size=8)), solutions)
+        self.assertEqual(batch.cache.hits, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# Imports
+from topology import get_topology
+
+class ExactCover:
+    '''A sudoku as an exact cover problem, solved with Knuth's Algorithm X.
+
+       Every row of the constraint matrix is the placement of a digit in a box
+       and every column is a constraint that has to be covered exactly once:
+       each box holds one digit and each unit holds each digit once. A
+       standard 9x9 sudoku has 81 + 27*9 = 324 columns, a diagnol sudoku adds
+       2*9 columns for its diagnols. The matrix is stored sparse, as a set of rows
+       per column, and covering a column removes the conflicting rows from
+       the sets - the dictionary based form of dancing links.
+    '''
+    def __init__(self, t):
+        n_boxes  = len(t.boxes)
+        n_digits = len(t.digits)
+        self.n_digits = n_digits
+        # Columns covered by each row. Row i*n_digits+d places digit d+1 in
+        # box i, box columns come first and are followed by unit columns
+        self.rows = []
+        for i in range(n_boxes):
+            for d in range(n_digits):
+                self.rows.append([i] + [n_boxes + u*n_digits + d for u in t.box_units[i]])
+        self.columns = {}
+        for r, cols in enumerate(self.rows):
+            for c in cols:
+                self.columns.setdefault(c, set()).add(r)
+        self.nodes = 0
+
+    def matrix(self, b):
+        '''
+        Return the columns of the matrix for a board in bitmask form with the
+        given digits already placed and the rows of the digits that are not a
+        candidate of their box removed. Returns None if the givens conflict
+        '''
+        X = dict((c, set(r)) for c, r in self.columns.items())
+        Y = self.rows
+        n = self.n_digits
+        givens = []
+        for i, m in enumerate(b):
+            for d in range(n):
+                if not m >> d & 1:
+                    for c in Y[i*n + d]:
+                        X[c].discard(i*n + d)
+            if m and not m & (m-1):
+                givens.append(i*n + m.bit_length() - 1)
+        for r in givens:
+            if not all(c in X and r in X[c] for c in Y[r]):
+                return None
+            self.select(X, r)
+        return X
+
+    def select(self, X, r):
+        '''
+        Cover the columns of row r and remove all rows that conflict with it.
+        Returns the removed columns so that the selection can be undone
+        '''
+        Y = self.rows
+        cols = []
+        for j in Y[r]:
+            for i in X[j]:
+                for k in Y[i]:
+                    if k != j:
+                        X[k].remove(i)
+            cols.append(X.pop(j))
+        return cols
+
+    def deselect(self, X, r, cols):
+        '''
+        Undo select()
+        '''
+        Y = self.rows
+        for j in reversed(Y[r]):
+            X[j] = cols.pop()
+            for i in X[j]:
+                for k in Y[i]:
+                    if k != j:
+                        X[k].add(i)
+
+    def search(self, X, partial):
+        '''
+        Generator over the solutions of the matrix X, each one a list of rows.
+        Always branches on the column with the fewest rows
+        '''
+        if not X:
+            yield list(partial)
+            return
+        c = min(X, key=lambda c: len(X[c]))
+        for r in sorted(X[c]):
+            self.nodes += 1
+            partial.append(r)
+            cols = self.select(X, r)
+            for solution in self.search(X, partial):
+                yield solution
+            self.deselect(X, r, cols)
+            partial.pop()
+
+    def solutions(self, b, limit=1):
+        '''
+        Return up to limit solutions of a board in bitmask form, each one a
+        board in bitmask form
+        '''
+        self.nodes = 0
+        X = self.matrix(b)
+        if X is None:
+            return []
+        found = []
+        for rows in self.search(X, []):
+            s = list(b)
+            for r in rows:
+                s[r // self.n_digits] = 1 << (r % self.n_digits)
+            found.append(s)
+            if len(found) >= limit:
+                break
+        return found
+
+    def count(self, b, limit):
+        '''
+        Count the solutions of a board in bitmask form, stopping once limit
+        solutions have been found
+        '''
+        return len(self.solutions(b, limit))
+
+# The exact cover problems built so far, one per sudoku variant
+covers = {}
+
+def get_exact_cover(is_diag=0, size=3):
+    '''
+    Return the exact cover problem of the standard (is_diag=0) or diagnol
+    (is_diag=1) sudoku with squares of size x size boxes. It is built the
+    first time it is asked for
+    '''
+    x = covers.get((is_diag, size))
+    if x is None:
+        x = covers[(is_diag, size)] = ExactCover(get_topology(is_diag, size))
+    return x
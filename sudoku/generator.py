@@ -0,0 +1,167 @@
+# Imports
+import sys
+import time
+import random
+import argparse
+from multiprocessing import Pool
+from sudoku import Sudoku
+
+# The techniques used to rate a puzzle, from the easiest to the hardest. A
+# puzzle is rated by the hardest technique needed to solve it, 'search' means
+# that the techniques alone do not solve it and the solver has to branch
+LEVELS = ['eliminate', 'only_choice', 'naked_twins', 'search']
+
+# The solver used by the current process. Every worker process of the pool
+# creates its own solver once when it starts
+solver = None
+
+def init_solver(is_diag, size=3):
+    """
+    Create the solver of the current process
+    """
+    global solver
+    solver = Sudoku(is_diag, size=size)
+
+def fill_grid(s, rng):
+    """
+    Return a random solved board in bitmask form. The board is filled by the
+    search of the solver with the candidates of every box tried in a random
+    order
+    """
+    b = [s.all_bits] * len(s.boxes)
+    fill_node(s, b, [], range(len(b)), rng)
+    return b
+
+def fill_node(s, b, trail, boxes, rng):
+    # Same as Sudoku.search_node() but the candidates of the branching box
+    # are shuffled
+    if not s.infer(b, trail, boxes):
+        return False
+    c_key = s.branch_box(b)
+    if c_key is None:
+        return True
+    mark = len(trail)
+    bits = [bit for _, bit in s.digit_bits if b[c_key] & bit]
+    rng.shuffle(bits)
+    for bit in bits:
+        trail.append((c_key, b[c_key]))
+        b[c_key] = bit
+        if fill_node(s, b, trail, [c_key], rng):
+            return True
+        s.undo(b, trail, mark)
+    return False
+
+def remove_clues(s, b, rng, min_clues=0):
+    """
+    Blank the boxes of a solved board in bitmask form one at a time in a random
+    order, keeping a box only if blanking it would give the puzzle a second
+    solution. The board is changed in place and returned. Unless min_clues
+    stops the removal early, the puzzle is minimal: no given can be removed
+    without losing the unique solution
+    """
+    clues = len(b)
+    order = list(range(len(b)))
+    rng.shuffle(order)
+    for i in order:
+        if clues <= min_clues:
+            break
+        m = b[i]
+        # The puzzle is unique without the given if no solution has another
+        # digit in the box, which needs a single failed search rather than a
+        # count of two solutions
+        b[i] = s.all_bits & ~m
+        if s.count_solutions(b, 1):
+            b[i] = m
+        else:
+            b[i] = s.all_bits
+            clues -= 1
+    return b
+
+def rate(s, grid):
+    """
+    Return the difficulty of a puzzle: the hardest of LEVELS needed to solve
+    it. The techniques are applied one at a time, always the easiest one that
+    still changes the board
+    """
+    b = s.board_bits(grid)
+    fns = [s.eliminate_bits, s.only_choice_bits, s.naked_twins_bits]
+    level = 0
+    while any(m & (m-1) for m in b):
+        before = list(b)
+        for k, fn in enumerate(fns):
+            fn(b)
+            if b != before:
+                level = max(level, k)
+                break
+        else:
+            return LEVELS[-1]
+        if 0 in b:
+            return LEVELS[-1]
+    return LEVELS[level]
+
+def generate_puzzle(seed, min_clues=0):
+    """
+    Generate a single puzzle with the solver of the current process. The same
+    seed always gives the same puzzle. Returns the puzzle as a line of one
+    character per box and its difficulty
+    """
+    rng = random.Random(seed)
+    b = remove_clues(solver, fill_grid(solver, rng), rng, min_clues)
+    return solver.bits_grid(b), rate(solver, b)
+
+def generate_task(args):
+    # Pool.imap() passes a single argument
+    return generate_puzzle(*args)
+
+def generate_batch(count, is_diag=0, workers=None, seed=None, min_clues=0, chunk_size=4, size=3):
+    """
+    Generator over count new puzzles, each one a tuple of the puzzle and its
+    difficulty. The puzzles are generated by a pool of worker processes,
+    puzzle i from seed+i, so a batch with a given seed is the same no matter
+    how many workers generate it. If workers is 1 then the puzzles are
+    generated in the current process
+    """
+    if seed is None:
+        seed = random.randrange(1 << 32)
+    tasks = ((seed + i, min_clues) for i in range(count))
+    if workers == 1:
+        init_solver(is_diag, size)
+        for task in tasks:
+            yield generate_task(task)
+        return
+    with Pool(workers, initializer=init_solver, initargs=(is_diag, size)) as pool:
+        for puzzle in pool.imap(generate_task, tasks, chunk_size):
+            yield puzzle
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate sudoku puzzles with a unique solution, one puzzle per line.')
+    parser.add_argument('count', type=int, help='number of puzzles to generate')
+    parser.add_argument('-o', '--output', default='-', help='file for the puzzles, - for stdout (default)')
+    parser.add_argument('-d', '--diag', action='store_true', help='generate diagonal sudokus')
+    parser.add_argument('-s', '--size', type=int, default=3, help='size of a square, 4 for 16x16 and 5 for 25x25 boards (default: 3)')
+    parser.add_argument('-m', '--min-clues', type=int, default=0, help='stop removing givens at this many (default: 0, remove as many as possible)')
+    parser.add_argument('-r', '--rate', action='store_true', help='write the difficulty after each puzzle')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the first puzzle (default: random)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per cpu)')
+    parser.add_argument('-c', '--chunk-size', type=int, default=4, help='puzzles generated by a worker at a time (default: 4)')
+    args = parser.parse_args(argv)
+
+    f_out  = sys.stdout if args.output == '-' else open(args.output, 'w')
+    levels = dict((l, 0) for l in LEVELS)
+    start  = time.time()
+    try:
+        for puzzle, level in generate_batch(args.count, 1 if args.diag else 0, args.workers, args.seed,
+                                            args.min_clues, args.chunk_size, args.size):
+            f_out.write(puzzle + (' ' + level if args.rate else '') + '\n')
+            levels[level] += 1
+    finally:
+        if f_out is not sys.stdout:
+            f_out.close()
+    elapsed = time.time() - start
+    sys.stderr.write('Generated %d puzzles in %.2fs (%.1f puzzles/min): %s\n' %
+                     (args.count, elapsed, args.count * 60.0 / elapsed if elapsed else 0.0,
+                      ', '.join('%d %s' % (levels[l], l) for l in LEVELS)))
+
+# Main
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+from sudoku import Sudoku
+import generator
+import unittest
+
+
+class TestGenerator(unittest.TestCase):
+    def assertMinimal(self, s, puzzle):
+        self.assertTrue(s.is_unique(puzzle))
+        # Every given is needed for the solution to be unique
+        for i, c in enumerate(puzzle):
+            if c != '.':
+                self.assertEqual(s.count_solutions(puzzle[:i] + '.' + puzzle[i+1:], 2), 2)
+
+    def test_unique_and_minimal(self):
+        for is_diag in [0, 1]:
+            s = Sudoku(is_diag)
+            for puzzle, level in generator.generate_batch(3, is_diag, workers=1, seed=7):
+                self.assertEqual(len(puzzle), 81)
+                self.assertIn(level, generator.LEVELS)
+                self.assertMinimal(s, puzzle)
+
+    def test_seed_and_workers(self):
+        single = list(generator.generate_batch(4, workers=1, seed=3))
+        self.assertEqual(list(generator.generate_batch(4, workers=2, seed=3, chunk_size=1)), single)
+        self.assertNotEqual(list(generator.generate_batch(4, workers=1, seed=4)), single)
+
+    def test_min_clues(self):
+        for puzzle, _ in generator.generate_batch(2, workers=1, seed=1, min_clues=40):
+            self.assertEqual(len(puzzle.replace('.', '')), 40)
+            self.assertTrue(Sudoku().is_unique(puzzle))
+
+    def test_rate(self):
+        s = Sudoku()
+        self.assertEqual(generator.rate(s, '..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..'), 'eliminate')
+        self.assertEqual(generator.rate(s, '.7.3...9..........61..74....97.6...3.....1.27......4....1.89..48...3.........2.61'), 'only_choice')
+        self.assertEqual(generator.rate(s, '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'), 'search')
+        solved = s.bits_grid(s.solve(s.grid_bits('4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......')))
+        self.assertEqual(generator.rate(s, '.' + solved[1:]), 'eliminate')
+
+if __name__ == '__main__':
+    unittest.main()
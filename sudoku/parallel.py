@@ -0,0 +1,203 @@
+# Imports
+import sys
+import time
+import argparse
+import multiprocessing
+from multiprocessing import Pool, cpu_count
+from sudoku import Sudoku, SearchCancelled
+
+# The solver of a worker process and the cancel flags shared with the parent,
+# one per subproblem. Every worker process sets them once when it starts
+solver = None
+flags  = None
+
+def init_worker(is_diag, size, cancel_flags):
+    """
+    Create the solver of the current process
+    """
+    global solver, flags
+    solver = Sudoku(is_diag, size=size)
+    flags  = cancel_flags
+
+def search_task(task):
+    """
+    Search a subproblem given as (k, board in bitmask form). Returns k, the
+    solved board (False if there is no solution, None if the search was
+    cancelled through flag k) and the nodes visited
+    """
+    k, b = task
+    solver.stop = lambda: flags[k]
+    try:
+        b = solver.search_bits(b)
+    except SearchCancelled:
+        b = None
+    finally:
+        solver.stop = None
+    return k, b, solver.nodes
+
+def count_task(task):
+    """
+    Count the solutions of a subproblem given as (k, board in bitmask form,
+    limit). Returns k, the number of solutions (None if cancelled) and the
+    nodes visited
+    """
+    k, b, limit = task
+    solver.stop = lambda: flags[k]
+    try:
+        n = solver.count_solutions(b, limit)
+    except SearchCancelled:
+        n = None
+    finally:
+        solver.stop = None
+    return k, n, solver.nodes
+
+class ParallelSearch:
+    '''Searches a single board on a pool of worker processes.
+
+       The top levels of the search tree are expanded in the current process,
+       level by level, until there are at least tasks subproblems. The
+       subproblems are the nodes of the last level in the order the search
+       would visit them, each searched by a worker. Every subproblem has a
+       cancel flag in shared memory that the search of its worker polls at
+       every node, so once a solution is found the subproblems that are no
+       longer needed stop.
+
+       By default the first solution found by any worker is returned. With
+       deterministic=True only the subproblems after the one that found a
+       solution are cancelled, and the result is the solution of the first
+       subproblem that has one - the solution Sudoku.search() finds. Counting
+       adds up the solutions of all subproblems and is always deterministic.
+       With workers=1 the subproblems are searched in the current process.
+    '''
+    def __init__(self, is_diag=0, workers=None, tasks=None, deterministic=False, size=3):
+        self.solver        = Sudoku(is_diag, size=size)
+        self.workers       = workers or cpu_count()
+        self.tasks         = tasks or 4 * self.workers
+        self.deterministic = deterministic
+        # A level has fewer than tasks nodes before it is expanded, so there
+        # are never more subproblems than this
+        self.flags         = multiprocessing.Array('b', self.tasks * len(self.solver.digits), lock=False)
+        self.nodes         = 0
+        if self.workers == 1:
+            self.pool = None
+            init_worker(is_diag, size, self.flags)
+        else:
+            self.pool = Pool(self.workers, initializer=init_worker, initargs=(is_diag, size, self.flags))
+
+    def split(self, b):
+        '''
+        Expand the top levels of the search tree of a board in bitmask form.
+        Returns the boards of the subproblems in the order the search would
+        visit them. Boards without a solution are left out
+        '''
+        s = self.solver
+        frontier = [list(b)]
+        while 0 < len(frontier) < self.tasks:
+            level    = []
+            branched = False
+            for node in frontier:
+                self.nodes += 1
+                if not s.infer(node, [], range(len(node))):
+                    continue
+                c_key = s.branch_box(node)
+                if c_key is None:
+                    level.append(node)
+                    continue
+                branched = True
+                for _, bit in s.digit_bits:
+                    if node[c_key] & bit:
+                        child = list(node)
+                        child[c_key] = bit
+                        level.append(child)
+            frontier = level
+            if not branched:
+                break
+        return frontier
+
+    def run(self, func, tasks):
+        # Generator over the results of the tasks as they are done
+        for k in range(len(tasks)):
+            self.flags[k] = 0
+        if self.pool is None:
+            return map(func, tasks)
+        return self.pool.imap_unordered(func, tasks)
+
+    def search(self, b):
+        '''
+        Solve a board in bitmask form. The board is updated in place and
+        returned, or False if it has no solution. The nodes visited by all
+        processes are kept in self.nodes
+        '''
+        self.nodes  = 0
+        subproblems = self.split(b)
+        best = None
+        for k, board, nodes in self.run(search_task, list(enumerate(subproblems))):
+            self.nodes += nodes
+            if board is None or board == False:
+                continue
+            if best is None or k < best[0]:
+                best = (k, board)
+                first = k + 1 if self.deterministic else 0
+                for j in range(first, len(subproblems)):
+                    self.flags[j] = 1
+        if best is None:
+            return False
+        b[:] = best[1]
+        return b
+
+    def count_solutions(self, grid, limit=2):
+        '''
+        Count the solutions of a grid given as a string or in dictionary or
+        bitmask form, stopping as soon as limit solutions have been found
+        '''
+        self.nodes  = 0
+        subproblems = self.split(self.solver.board_bits(grid))
+        count = 0
+        for k, n, nodes in self.run(count_task, [(k, p, limit) for k, p in enumerate(subproblems)]):
+            self.nodes += nodes
+            if n is not None:
+                count += n
+                if count >= limit:
+                    for j in range(len(subproblems)):
+                        self.flags[j] = 1
+        return min(count, limit)
+
+    def close(self):
+        '''
+        Stop the searches in progress and shut the worker processes down
+        '''
+        for k in range(len(self.flags)):
+            self.flags[k] = 1
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a single sudoku puzzle by searching the top of its search tree on a pool of worker processes.')
+    parser.add_argument('grid', help='the puzzle, one character per box with . or 0 for a blank box')
+    parser.add_argument('-d', '--diag', action='store_true', help='the puzzle is a diagonal sudoku')
+    parser.add_argument('-s', '--size', type=int, default=3, help='size of a square, 4 for 16x16 and 5 for 25x25 boards (default: 3)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per cpu)')
+    parser.add_argument('-t', '--tasks', type=int, default=None, help='least number of subproblems (default: 4 per worker)')
+    parser.add_argument('-n', '--count', type=int, default=None, metavar='LIMIT', help='count the solutions up to LIMIT instead of solving')
+    parser.add_argument('--deterministic', action='store_true', help='return the solution the sequential search finds')
+    args = parser.parse_args(argv)
+
+    p = ParallelSearch(1 if args.diag else 0, args.workers, args.tasks, args.deterministic, args.size)
+    try:
+        s = p.solver
+        if len(args.grid) != len(s.boxes):
+            parser.error('a grid needs %d characters, not %d' % (len(s.boxes), len(args.grid)))
+        start = time.time()
+        if args.count is not None:
+            sys.stdout.write('%d\n' % p.count_solutions(args.grid.replace('0', '.'), args.count))
+        else:
+            b = p.search(s.grid_bits(args.grid.replace('0', '.')))
+            sys.stdout.write((s.bits_grid(b) if b != False else '') + '\n')
+        sys.stderr.write('%d nodes in %.3fs\n' % (p.nodes, time.time() - start))
+    finally:
+        p.close()
+
+# Main
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+from sudoku import Sudoku
+from parallel import ParallelSearch
+import sudoku_test
+import unittest
+
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self):
+        self.p = ParallelSearch(workers=2, tasks=6, deterministic=True)
+
+    def tearDown(self):
+        self.p.close()
+
+    def test_deterministic(self):
+        s = Sudoku()
+        for g in sudoku_test.TestSearch.hard_grids:
+            self.assertEqual(self.p.search(s.grid_bits(g)), s.search(s.grid_bits(g)))
+        # A board with many solutions gives the one of the sequential search
+        g = '.' + sudoku_test.TestSearch.hard_grids[0][1:]
+        self.assertEqual(self.p.search(s.grid_bits(g)), s.search(s.grid_bits(g)))
+        self.assertEqual(self.p.search(s.grid_bits('11' + '.'*79)), False)
+
+    def test_split(self):
+        s = Sudoku()
+        b = s.grid_bits('.'*81)
+        subproblems = self.p.split(b)
+        self.assertTrue(len(subproblems) >= 6)
+        # The subproblems are in the order of the sequential search
+        self.assertEqual(s.search(subproblems[0]), s.search(b))
+
+    def test_count(self):
+        g = sudoku_test.TestSearch.hard_grids[0]
+        self.assertEqual(self.p.count_solutions(g), 1)
+        self.assertEqual(self.p.count_solutions('.' + g[1:], 2), 2)
+        self.assertEqual(self.p.count_solutions('.'*81, 50), 50)
+
+    def test_first_solution(self):
+        s = Sudoku()
+        p = ParallelSearch(workers=1, tasks=6)
+        b = p.search(s.grid_bits('.'*81))
+        self.assertTrue(b and all(m and not m & (m-1) for m in b))
+        self.assertEqual(s.count_solutions(b), 1)
+        p.close()
+        p = ParallelSearch(size=2, workers=2)
+        self.assertEqual(p.count_solutions('.'*16, 1000), 288)
+        p.close()
+
+if __name__ == '__main__':
+    unittest.main()
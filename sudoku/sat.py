@@ -0,0 +1,437 @@
+# Imports
+import sys
+import argparse
+from heapq import heappush, heappop, heapify
+from topology import get_topology
+
+class CDCL:
+    '''A conflict driven clause learning SAT solver.
+
+       Variables are numbered from 1 and clauses are lists of non-zero
+       integers as in the DIMACS format, -v being the negation of variable v.
+       Inside the solver the literal v is 2*v and -v is 2*v+1, so the negation
+       of a literal is lit ^ 1 and the value of a literal is looked up in a
+       flat list (1 true, -1 false, 0 unassigned).
+
+       Clauses are watched by two of their literals, a clause is only looked
+       at when one of its watched literals becomes false. A conflict is
+       analysed back to its first unique implication point and the learnt
+       clause makes the search jump back to the level where it becomes unit.
+       Decisions follow the activity of the variables in recent conflicts
+       (VSIDS) with saved phases, and the search restarts after a number of
+       conflicts that follows the Luby sequence.
+
+       Binary clauses that are known when the solver is created can be given
+       as implied, a list of the literals implied by every literal. These
+       lists are only read, so one can be shared by many solvers.
+    '''
+    def __init__(self, n_vars, implied=None):
+        self.n_vars    = n_vars
+        self.implied   = implied or [()] * (2*n_vars + 2)
+        self.value     = [0] * (2*n_vars + 2)
+        self.level     = [0] * (n_vars + 1)
+        # The reason of an implied variable is the clause that implied it with
+        # the implied literal first, or for an implied binary clause the
+        # literal that implied it. Decisions have no reason
+        self.reason    = [None] * (n_vars + 1)
+        self.phase     = [0] * (n_vars + 1)
+        self.activity  = [0.0] * (n_vars + 1)
+        self.increment = 1.0
+        self.heap      = [(0.0, v) for v in range(1, n_vars + 1)]
+        self.watches   = [[] for _ in range(2*n_vars + 2)]
+        self.trail     = []
+        self.levels    = []
+        self.head      = 0
+        self.ok        = True
+        self.nodes     = 0
+        self.conflicts = 0
+
+    def literal(self, x):
+        '''
+        Convert a DIMACS literal into a literal of the solver
+        '''
+        return 2*x if x > 0 else 1 - 2*x
+
+    def add_clause(self, clause):
+        '''
+        Add a clause given as a list of DIMACS literals. The search goes back
+        to level 0 first. Returns False if the clauses have no solution
+        '''
+        self.backtrack(0)
+        value = self.value
+        lits  = []
+        for x in clause:
+            lit = self.literal(x)
+            if value[lit] == 1 or lit ^ 1 in lits:
+                return self.ok
+            if value[lit] == 0 and lit not in lits:
+                lits.append(lit)
+        if not lits:
+            self.ok = False
+        elif len(lits) == 1:
+            self.assign(lits[0], None)
+        else:
+            self.watches[lits[0]].append(lits)
+            self.watches[lits[1]].append(lits)
+        return self.ok
+
+    def assign(self, lit, reason):
+        self.value[lit]     = 1
+        self.value[lit ^ 1] = -1
+        self.level[lit >> 1]  = len(self.levels)
+        self.reason[lit >> 1] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        '''
+        Assign the literals implied by the assignments on the trail that have
+        not been propagated yet. Returns the clause that became false, or None
+        '''
+        value, trail, watches, implied = self.value, self.trail, self.watches, self.implied
+        level, reason = self.level, self.reason
+        while self.head < len(trail):
+            p = trail[self.head]
+            self.head += 1
+            depth = len(self.levels)
+            for q in implied[p]:
+                if value[q] == 1:
+                    continue
+                if value[q] == -1:
+                    return [q, p ^ 1]
+                value[q]     = 1
+                value[q ^ 1] = -1
+                level[q >> 1]  = depth
+                reason[q >> 1] = p
+                trail.append(q)
+            # Every clause watching the literal that became false looks for
+            # another literal to watch, or is unit or false
+            false_lit = p ^ 1
+            ws = watches[false_lit]
+            watches[false_lit] = kept = []
+            for k, c in enumerate(ws):
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], false_lit
+                first = c[0]
+                if value[first] == 1:
+                    kept.append(c)
+                    continue
+                for m in range(2, len(c)):
+                    if value[c[m]] != -1:
+                        c[1], c[m] = c[m], false_lit
+                        watches[c[1]].append(c)
+                        break
+                else:
+                    kept.append(c)
+                    if value[first] == -1:
+                        kept.extend(ws[k+1:])
+                        return c
+                    value[first]     = 1
+                    value[first ^ 1] = -1
+                    level[first >> 1]  = depth
+                    reason[first >> 1] = c
+                    trail.append(first)
+        return None
+
+    def analyse(self, conflict):
+        '''
+        Learn a clause from a conflict. Returns the clause, with the literal
+        that is asserted after backtracking first and the literal of the
+        highest of the other levels second, and the level to go back to
+        '''
+        level, reason, trail = self.level, self.reason, self.trail
+        depth   = len(self.levels)
+        seen    = set()
+        learnt  = [0]
+        pending = 0
+        lits    = conflict
+        i       = len(trail) - 1
+        while True:
+            for q in lits:
+                v = q >> 1
+                if v not in seen and level[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if level[v] == depth:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            # The most recent assignment of the current level in the conflict
+            while trail[i] >> 1 not in seen:
+                i -= 1
+            p = trail[i]
+            i -= 1
+            seen.discard(p >> 1)
+            pending -= 1
+            if not pending:
+                break
+            r    = reason[p >> 1]
+            lits = [r ^ 1] if isinstance(r, int) else r[1:]
+        learnt[0] = p ^ 1
+        if len(learnt) == 1:
+            return learnt, 0
+        k = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            self.activity  = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(1, self.n_vars + 1) if not self.value[2*u]]
+            heapify(self.heap)
+
+    def backtrack(self, depth):
+        '''
+        Undo the assignments of the levels above depth
+        '''
+        if len(self.levels) <= depth:
+            return
+        value, heap, activity = self.value, self.heap, self.activity
+        mark = self.levels[depth]
+        for lit in self.trail[mark:]:
+            v = lit >> 1
+            value[lit] = value[lit ^ 1] = 0
+            self.reason[v] = None
+            self.phase[v]  = lit & 1
+            heappush(heap, (-activity[v], v))
+        del self.trail[mark:]
+        del self.levels[depth:]
+        self.head = mark
+        # The heap holds an entry per unassignment, drop the stale ones now
+        # and then
+        if len(heap) > 4 * self.n_vars:
+            self.heap = [(-activity[u], u) for u in range(1, self.n_vars + 1) if not value[2*u]]
+            heapify(self.heap)
+
+    def decide(self):
+        '''
+        Return the unassigned variable with the highest activity, or None if
+        all variables are assigned
+        '''
+        heap, value = self.heap, self.value
+        while heap:
+            v = heappop(heap)[1]
+            if not value[2*v]:
+                return v
+        return None
+
+    def solve(self, stop=None):
+        '''
+        Search for an assignment that satisfies all clauses. Returns True if
+        one was found, False if there is none and None if the callable stop
+        returned True, which is polled at every decision
+        '''
+        if not self.ok:
+            return False
+        restarts = 1
+        limit    = 64 * luby(restarts)
+        count    = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                count += 1
+                if not self.levels:
+                    self.ok = False
+                    return False
+                learnt, depth = self.analyse(conflict)
+                self.backtrack(depth)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.watches[learnt[0]].append(learnt)
+                    self.watches[learnt[1]].append(learnt)
+                    self.assign(learnt[0], learnt)
+                self.increment /= 0.95
+                continue
+            if count >= limit:
+                restarts += 1
+                limit = 64 * luby(restarts)
+                count = 0
+                self.backtrack(0)
+                continue
+            v = self.decide()
+            if v is None:
+                return True
+            self.nodes += 1
+            if stop is not None and stop():
+                self.backtrack(0)
+                return None
+            self.levels.append(len(self.trail))
+            self.assign(2*v + self.phase[v], None)
+
+    def model(self):
+        '''
+        The values of the variables after solve() returned True, True or False
+        for every variable with the value of variable 0 first
+        '''
+        return [self.value[2*v] == 1 for v in range(self.n_vars + 1)]
+
+def luby(i):
+    '''
+    The i-th element of the Luby sequence 1 1 2 1 1 2 4 1 1 2 ..., from i=1
+    '''
+    k = 1
+    while True:
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        if i < (1 << k) - 1:
+            return luby(i - (1 << (k - 1)) + 1)
+        k += 1
+
+class SatEncoding:
+    '''A sudoku as a boolean satisfiability problem.
+
+       Variable i*n + d + 1 is true if digit d+1 is in box i, where n is the
+       number of digits. The clauses say that every box holds at least one
+       digit and every unit holds every digit at least once, and that no two
+       digits share a box and no two peers share a digit - the binary
+       at-most-one clauses that make up almost all of the problem. The
+       binary clauses are the same for every board of the variant, so they
+       are built once as the implications used by every CDCL solver. A board
+       adds a unit clause for every given and every candidate that has been
+       removed.
+    '''
+    def __init__(self, t):
+        n_boxes  = len(t.boxes)
+        n_digits = len(t.digits)
+        self.n_digits = n_digits
+        self.n_vars   = n_boxes * n_digits
+        # Clauses of at least one digit per box and place per unit and digit
+        self.at_least_one = ([[self.var(i, d) for d in range(n_digits)] for i in range(n_boxes)] +
+                             [[self.var(i, d) for i in unit] for unit in t.unit_index for d in range(n_digits)])
+        # Pairs of variables of which at most one is true
+        self.pairs = ([(self.var(i, d), self.var(i, e)) for i in range(n_boxes)
+                       for d in range(n_digits) for e in range(d + 1, n_digits)] +
+                      [(self.var(i, d), self.var(j, d)) for i in range(n_boxes)
+                       for j in t.peer_index[i] if j > i for d in range(n_digits)])
+        implied = [[] for _ in range(2*self.n_vars + 2)]
+        for x, y in self.pairs:
+            implied[2*x].append(2*y + 1)
+            implied[2*y].append(2*x + 1)
+        self.implied = [tuple(lits) for lits in implied]
+        self.nodes = 0
+
+    def var(self, i, d):
+        '''
+        The variable of digit d+1 in box i
+        '''
+        return i * self.n_digits + d + 1
+
+    def board_clauses(self, b):
+        '''
+        The unit clauses of a board in bitmask form
+        '''
+        clauses = []
+        for i, m in enumerate(b):
+            if m and not m & (m-1):
+                clauses.append([self.var(i, m.bit_length() - 1)])
+            for d in range(self.n_digits):
+                if not m >> d & 1:
+                    clauses.append([-self.var(i, d)])
+        return clauses
+
+    def clauses(self, b):
+        '''
+        Return all clauses of a board in bitmask form, as lists of DIMACS
+        literals
+        '''
+        return ([list(c) for c in self.at_least_one] + [[-x, -y] for x, y in self.pairs] +
+                self.board_clauses(b))
+
+    def dimacs(self, b):
+        '''
+        Return the clauses of a board in bitmask form in the DIMACS CNF format
+        '''
+        clauses = self.clauses(b)
+        lines = ['p cnf %d %d' % (self.n_vars, len(clauses))]
+        lines.extend(' '.join(str(x) for x in c) + ' 0' for c in clauses)
+        return '\n'.join(lines) + '\n'
+
+    def solver(self, b):
+        '''
+        Return a CDCL solver with the clauses of a board in bitmask form
+        '''
+        e = CDCL(self.n_vars, self.implied)
+        for c in self.at_least_one:
+            e.add_clause(c)
+        for c in self.board_clauses(b):
+            e.add_clause(c)
+        return e
+
+    def solutions(self, b, limit=1, stop=None):
+        '''
+        Return up to limit solutions of a board in bitmask form, each one a
+        board in bitmask form. Every solution that is found is excluded by a
+        clause before the next one is searched for. Returns None if the
+        callable stop returned True before the search was done
+        '''
+        e = self.solver(b)
+        self.nodes = 0
+        found = []
+        n = self.n_digits
+        while len(found) < limit:
+            result = e.solve(stop)
+            self.nodes = e.nodes
+            if result is None:
+                return None
+            if not result:
+                break
+            model = e.model()
+            s = [0] * len(b)
+            block = []
+            for v in range(1, self.n_vars + 1):
+                if model[v]:
+                    s[(v - 1) // n] = 1 << ((v - 1) % n)
+                    block.append(-v)
+            found.append(s)
+            if not e.add_clause(block):
+                break
+        return found
+
+    def count(self, b, limit, stop=None):
+        '''
+        Count the solutions of a board in bitmask form, stopping once limit
+        solutions have been found. Returns None if stop returned True
+        '''
+        found = self.solutions(b, limit, stop)
+        return None if found is None else len(found)
+
+# The encodings built so far, one per sudoku variant
+encodings = {}
+
+def get_sat_encoding(is_diag=0, size=3):
+    '''
+    Return the SAT encoding of the standard (is_diag=0) or diagnol (is_diag=1)
+    sudoku with squares of size x size boxes. It is built the first time it
+    is asked for
+    '''
+    x = encodings.get((is_diag, size))
+    if x is None:
+        x = encodings[(is_diag, size)] = SatEncoding(get_topology(is_diag, size))
+    return x
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a sudoku puzzle as a CNF formula in the DIMACS format.')
+    parser.add_argument('grid', help='the puzzle, one character per box with . or 0 for a blank box')
+    parser.add_argument('-d', '--diag', action='store_true', help='the puzzle is a diagonal sudoku')
+    parser.add_argument('-s', '--size', type=int, default=3, help='size of a square, 4 for 16x16 and 5 for 25x25 boards (default: 3)')
+    parser.add_argument('-o', '--output', default='-', help='file for the formula, - for stdout (default)')
+    args = parser.parse_args(argv)
+
+    t = get_topology(1 if args.diag else 0, args.size)
+    if len(args.grid) != len(t.boxes):
+        parser.error('a grid needs %d characters, not %d' % (len(t.boxes), len(args.grid)))
+    masks = dict(t.digit_bits)
+    b = [masks.get(c, t.all_bits) for c in args.grid]
+    x = get_sat_encoding(1 if args.diag else 0, args.size)
+    if args.output == '-':
+        sys.stdout.write(x.dimacs(b))
+    else:
+        with open(args.output, 'w') as f:
+            f.write(x.dimacs(b))
+
+# Main
+if __name__ == '__main__':
+    main()
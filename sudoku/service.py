@@ -0,0 +1,264 @@
+# Imports
+import sys
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse, parse_qs
+from sudoku import Sudoku, SearchCancelled
+from topology import get_topology
+from batch import read_puzzles
+from benchmark import percentile
+
+class ServiceBusy(Exception):
+    '''Raised by solve_async() when too many requests are already waiting'''
+    pass
+
+# Largest request body accepted by the HTTP front end, in bytes
+MAX_BODY = 4096
+
+# The solver of a worker process and the cancel flags shared with the service,
+# one per slot. Every worker process sets them once when it starts
+solver = None
+flags  = None
+
+def init_worker(is_diag, size, cancel_flags):
+    """
+    Create the solver of a worker process
+    """
+    global solver, flags
+    solver = Sudoku(is_diag, size=size)
+    flags  = cancel_flags
+
+def solve_task(grid, slot, deadline):
+    """
+    Solve a single puzzle in a worker process. The search gives up once the
+    cancel flag of its slot is set or the deadline (a time.time() value) has
+    passed. Returns the solution as a line of digits, an empty line if the
+    puzzle has no solution or None if the search was cancelled
+    """
+    solver.stop = lambda: flags[slot] or time.time() > deadline
+    try:
+        b = solver.search_bits(solver.grid_bits(grid.replace('0', '.')))
+    except SearchCancelled:
+        return None
+    finally:
+        solver.stop = None
+    return solver.bits_grid(b) if b != False else ''
+
+class SolveService:
+    '''Solves puzzles for asyncio code on a pool of worker processes, so a
+       slow search never blocks the event loop.
+
+       At most slots puzzles are in the pool at a time and at most max_pending
+       requests wait for a slot, beyond that solve_async() raises ServiceBusy.
+       Every slot has a cancel flag in shared memory that the search of the
+       worker polls at every node. When a request times out or is cancelled
+       its flag is set, so the worker stops searching and is free for the next
+       puzzle instead of finishing a search nobody waits for.
+
+       The worker processes are all started when the service is created. A
+       process forked later, e.g. while an HTTP connection is being handled,
+       would inherit the open sockets of the service and keep them open.
+
+       The free slots are a plain list and a request that waits for one gets
+       a future of its own event loop, so the service can be used from one
+       event loop after another, e.g. by consecutive asyncio.run() calls.
+    '''
+    def __init__(self, is_diag=0, workers=None, slots=None, max_pending=1024, size=3):
+        self.workers     = workers or multiprocessing.cpu_count()
+        self.slots       = slots or 2 * self.workers
+        self.max_pending = max_pending
+        self.flags       = multiprocessing.Array('b', self.slots, lock=False)
+        self.pool        = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                               initargs=(is_diag, size, self.flags))
+        self.free        = list(range(self.slots))
+        self.waiters     = deque()
+        self.pending     = 0
+        self.n_boxes     = len(get_topology(is_diag, size).boxes)
+        for f in [self.pool.submit(time.sleep, 0.01) for _ in range(self.workers)]:
+            f.result()
+
+    async def solve_async(self, grid, timeout=None):
+        '''
+        Solve a puzzle given as a line of one character per box. Returns the
+        solution as a line of digits or an empty line if the puzzle has no
+        solution. Raises asyncio.TimeoutError if the puzzle is not solved
+        within timeout seconds, including the time spent waiting for a slot
+        and ValueError if the grid does not have one character per box
+        '''
+        if len(grid) != self.n_boxes:
+            raise ValueError('a grid needs %d characters, not %d' % (self.n_boxes, len(grid)))
+        loop  = asyncio.get_running_loop()
+        start = loop.time()
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.pending >= self.max_pending:
+                raise ServiceBusy('%d requests are waiting' % self.pending)
+            waiter = loop.create_future()
+            self.waiters.append(waiter)
+            self.pending += 1
+            try:
+                slot = await asyncio.wait_for(waiter, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                # A slot handed over as the wait ended goes to the next request
+                if waiter.done() and not waiter.cancelled():
+                    self.release(waiter.result())
+                raise
+            finally:
+                self.pending -= 1
+
+        # The slot is given back once the worker is done with it, which may be
+        # after the request has timed out
+        self.flags[slot] = 0
+        remaining = None if timeout is None else max(0.0, timeout - (loop.time() - start))
+        deadline  = time.time() + (remaining if remaining is not None else 1e9)
+        future = loop.run_in_executor(self.pool, solve_task, grid, slot, deadline)
+        future.add_done_callback(lambda f: self.release(slot))
+        try:
+            solution = await asyncio.wait_for(asyncio.shield(future), remaining)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self.flags[slot] = 1
+            raise
+        if solution is None:
+            raise asyncio.TimeoutError()
+        return solution
+
+    def release(self, slot):
+        '''
+        Give a slot to the first request still waiting for one, or back to
+        the free slots
+        '''
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(slot)
+                return
+        self.free.append(slot)
+
+    def close(self):
+        '''
+        Stop the searches in progress and shut the worker processes down
+        '''
+        for slot in range(self.slots):
+            self.flags[slot] = 1
+        self.pool.shutdown(wait=True)
+
+async def handle_http(service, reader, writer, timeout):
+    # Answer a single HTTP request: GET /solve?grid=...&timeout=... or POST
+    # /solve with the grid as the body. The answer is JSON with the solution
+    # and the time taken in milliseconds
+    start = time.perf_counter()
+    status, body = 400, {'error': 'bad request'}
+    try:
+        request = (await reader.readline()).decode('ascii', 'replace').split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('ascii', 'replace').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if len(request) >= 2 and urlparse(request[1]).path == '/solve':
+            query = parse_qs(urlparse(request[1]).query)
+            grid  = query.get('grid', [''])[0]
+            if request[0] == 'POST':
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    raise ValueError('request body too large')
+                grid = (await reader.readexactly(length)).decode('ascii').strip()
+            t = float(query['timeout'][0]) if 'timeout' in query else timeout
+            if grid:
+                try:
+                    status, body = 200, {'solution': await service.solve_async(grid, t)}
+                except asyncio.TimeoutError:
+                    status, body = 504, {'error': 'timeout'}
+                except ServiceBusy:
+                    status, body = 503, {'error': 'busy'}
+        elif len(request) >= 2:
+            status, body = 404, {'error': 'not found'}
+    except (ValueError, asyncio.IncompleteReadError) as e:
+        status, body = 400, {'error': str(e) or 'bad request'}
+    except BrokenProcessPool:
+        status, body = 500, {'error': 'worker pool is broken'}
+    except Exception as e:
+        # An error of the solver in a worker process
+        status, body = 500, {'error': '%s: %s' % (type(e).__name__, e)}
+    body['ms'] = (time.perf_counter() - start) * 1000.0
+    data = json.dumps(body).encode('ascii')
+    reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+    writer.write(('HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: close\r\n\r\n'
+                  % (status, reasons[status], len(data))).encode('ascii') + data)
+    await writer.drain()
+    writer.close()
+
+async def serve_http(service, host='127.0.0.1', port=8080, timeout=None):
+    """
+    Serve puzzles over HTTP until cancelled. Returns the asyncio server once
+    it is listening
+    """
+    return await asyncio.start_server(lambda r, w: handle_http(service, r, w, timeout), host, port)
+
+async def solve_lines(service, puzzles, concurrency=64, timeout=None):
+    """
+    Solve a list of puzzles with up to concurrency requests in flight.
+    Returns the solutions in the same order (None for a puzzle that timed
+    out, an empty line for one without a solution or of the wrong length) and the latency of every request in milliseconds
+    """
+    limit = asyncio.Semaphore(concurrency)
+    async def one(grid):
+        async with limit:
+            start = time.perf_counter()
+            try:
+                solution = await service.solve_async(grid, timeout)
+            except asyncio.TimeoutError:
+                solution = None
+            except ValueError:
+                solution = ''
+            return solution, (time.perf_counter() - start) * 1000.0
+    results = await asyncio.gather(*(one(g) for g in puzzles))
+    return [r[0] for r in results], [r[1] for r in results]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve sudoku puzzles on a pool of worker processes, read from stdin or served over HTTP.')
+    parser.add_argument('--http', type=int, default=None, metavar='PORT', help='serve GET/POST /solve on this port instead of reading stdin')
+    parser.add_argument('-d', '--diag', action='store_true', help='solve diagonal sudokus')
+    parser.add_argument('-s', '--size', type=int, default=3, help='size of a square, 4 for 16x16 and 5 for 25x25 boards (default: 3)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per cpu)')
+    parser.add_argument('-t', '--timeout', type=float, default=None, help='seconds a puzzle may take (default: no limit)')
+    parser.add_argument('-c', '--concurrency', type=int, default=64, help='requests in flight when reading stdin (default: 64)')
+    args = parser.parse_args(argv)
+
+    service = SolveService(1 if args.diag else 0, args.workers, size=args.size)
+    try:
+        if args.http is not None:
+            async def serve():
+                server = await serve_http(service, port=args.http, timeout=args.timeout)
+                sys.stderr.write('Serving on port %d\n' % args.http)
+                async with server:
+                    await server.serve_forever()
+            try:
+                asyncio.run(serve())
+            except KeyboardInterrupt:
+                pass
+            return
+        puzzles = list(read_puzzles(sys.stdin))
+        start   = time.time()
+        solutions, latency = asyncio.run(solve_lines(service, puzzles, args.concurrency, args.timeout))
+        elapsed = time.time() - start
+        for solution in solutions:
+            sys.stdout.write((solution if solution is not None else 'timeout') + '\n')
+        sys.stderr.write('Solved %d puzzles in %.2fs (%.1f puzzles/sec), latency p50 %.3fms p99 %.3fms, %d timed out\n' %
+                         (len(puzzles), elapsed, len(puzzles) / elapsed if elapsed else 0.0,
+                          percentile(latency, 50), percentile(latency, 99), solutions.count(None)))
+    finally:
+        service.close()
+
+# Main
+if __name__ == '__main__':
+    main()
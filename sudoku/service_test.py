@@ -0,0 +1,104 @@
+from sudoku import Sudoku
+import service
+import asyncio
+import json
+import unittest
+
+
+class TestSolveService(unittest.TestCase):
+    grids = ['4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+             '003020600900305001001806400008102900700000008006708200002609500800203009005010300',
+             '11' + '.'*79]
+
+    def large_grid(self, holes):
+        # A 25x25 board made from a pattern with every holes-th box blanked,
+        # with holes=3 the search takes far longer than the tests wait
+        s = Sudoku(size=5)
+        g = ''.join(s.digits[(5*(r % 5) + r//5 + c) % 25] for r in range(25) for c in range(25))
+        return ''.join('.' if i % holes else c for i, c in enumerate(g))
+
+    def test_solve(self):
+        s = Sudoku()
+        expected = [s.bits_grid(s.solve(s.grid_bits(g.replace('0', '.')))) if g[1] != '1' else '' for g in self.grids]
+        sv = service.SolveService(workers=2)
+        try:
+            solutions, latency = asyncio.run(service.solve_lines(sv, self.grids * 3 + ['1..'], concurrency=4))
+        finally:
+            sv.close()
+        self.assertEqual(solutions, expected * 3 + [''])
+        self.assertEqual(len(latency), 10)
+
+    def test_timeout_cancels_search(self):
+        sv = service.SolveService(workers=1, slots=1, size=5)
+        async def run():
+            with self.assertRaises(asyncio.TimeoutError):
+                await sv.solve_async(self.large_grid(3), timeout=0.3)
+            # The worker gave up the first search, so it is free at once
+            return await sv.solve_async(self.large_grid(2), timeout=5)
+        try:
+            self.assertEqual(len(asyncio.run(run())), 625)
+        finally:
+            sv.close()
+
+    def test_busy(self):
+        sv = service.SolveService(workers=1, slots=1, max_pending=0, size=5)
+        async def run():
+            slow = asyncio.ensure_future(sv.solve_async(self.large_grid(3)))
+            await asyncio.sleep(0.1)
+            with self.assertRaises(service.ServiceBusy):
+                await sv.solve_async(self.large_grid(2))
+            slow.cancel()
+            await asyncio.sleep(0.1)
+            return await sv.solve_async(self.large_grid(2), timeout=5)
+        try:
+            self.assertEqual(len(asyncio.run(run())), 625)
+        finally:
+            sv.close()
+
+    def test_event_loops(self):
+        # Requests wait for the single slot in two event loops one after the
+        # other
+        s = Sudoku()
+        expected = s.bits_grid(s.solve(s.grid_bits(self.grids[0])))
+        sv = service.SolveService(workers=1, slots=1)
+        try:
+            for _ in range(2):
+                solutions, _ = asyncio.run(service.solve_lines(sv, self.grids[:1] * 4, concurrency=4))
+                self.assertEqual(solutions, [expected] * 4)
+        finally:
+            sv.close()
+
+    def test_http(self):
+        sv = service.SolveService(workers=1)
+        async def run():
+            server = await service.serve_http(sv, port=0)
+            port = server.sockets[0].getsockname()[1]
+            replies = []
+            for request in ['GET /solve?grid=%s HTTP/1.1\r\n\r\n' % self.grids[0],
+                            'POST /solve HTTP/1.1\r\nContent-Length: 81\r\n\r\n%s' % self.grids[2],
+                            'GET /other HTTP/1.1\r\n\r\n',
+                            'GET /solve?grid=1.. HTTP/1.1\r\n\r\n',
+                            'POST /solve HTTP/1.1\r\nContent-Length: 100000000\r\n\r\n']:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(request.encode('ascii'))
+                status = (await reader.readline()).split()[1]
+                body = (await reader.read()).split(b'\r\n\r\n', 1)[1]
+                replies.append((int(status), json.loads(body.decode('ascii'))))
+                writer.close()
+            server.close()
+            await server.wait_closed()
+            return replies
+        try:
+            replies = asyncio.run(run())
+        finally:
+            sv.close()
+        self.assertEqual(replies[0][0], 200)
+        self.assertTrue(replies[0][1]['solution'].startswith('417369825'))
+        self.assertEqual(replies[1][0], 200)
+        self.assertEqual(replies[1][1]['solution'], '')
+        self.assertEqual(replies[2][0], 404)
+        self.assertEqual(replies[3][0], 400)
+        self.assertEqual(replies[4][0], 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,16 +1,108 @@
 # Imports
+from array import array
 from sudoku import Sudoku
 
-assignments = []
+class AssignmentLog:
+    """
+    A record of the values assigned to boxes while solving. Instead of a copy
+    of the whole board per assignment only the board at the start and a
+    (box, new value) delta per assignment are stored, in two compact arrays.
+    The board after each assignment is rebuilt on demand by frames(). If
+    enabled is False nothing is recorded. The log follows a single board,
+    the one given to start().
+    """
+    def __init__(self, s):
+        self.s       = s
+        self.enabled = True
+        self.clear()
+
+    def clear(self):
+        """
+        Forget all recorded assignments
+        """
+        self.initial = None
+        self.board   = None
+        self.box_log = array('H')
+        self.val_log = array('L')
+
+    def start(self, values):
+        """
+        Set the board, in dictionary or bitmask form, that the recorded
+        assignments start from and forget the previous assignments
+        """
+        self.clear()
+        self.board = values
+        if isinstance(values, dict):
+            values = self.s.values_to_bits(values)
+        self.initial = array('L', values)
+
+    def record(self, i, m):
+        """
+        Record that box number i was set to the candidates in bitmask m
+        """
+        if self.enabled:
+            self.box_log.append(i)
+            self.val_log.append(m)
+
+    def __len__(self):
+        return len(self.box_log)
+
+    def __iter__(self):
+        return self.frames()
+
+    def frames(self, solved_only=False):
+        """
+        Generator over the board, in dictionary form, after each recorded
+        assignment. If solved_only is True then only the boards where a box
+        was set to a new single value are returned
+        """
+        s = self.s
+        b = list(self.initial) if self.initial is not None else [s.all_bits]*len(s.boxes)
+        d = s.bits_to_values(b)
+        for i, m in zip(self.box_log, self.val_log):
+            changed = b[i] != m
+            b[i] = m
+            d[s.boxes[i]] = s.mask_values(m)
+            if not solved_only or (changed and m and not m & (m-1)):
+                yield d.copy()
+
+class RecordedBoard(list):
+    """
+    The bitmask form of a board that records every change of a box in an
+    AssignmentLog. A plain list is used when nothing needs to be recorded,
+    so solving without recording has no extra cost.
+    """
+    def __init__(self, b, log):
+        list.__init__(self, b)
+        self.log = log
+        log.start(self)
+
+    def __setitem__(self, i, m):
+        list.__setitem__(self, i, m)
+        self.log.record(i, m)
+
+assignments = AssignmentLog(Sudoku(1))
+
+def set_recording(enabled):
+    """
+    Switch the recording of assignments on or off. Recording is on by
+    default, switch it off when solving without visualization
+    """
+    assignments.enabled = enabled
+    if not enabled:
+        assignments.clear()
 
 def assign_value(values, box, value):
     """
     Please use this function to update your values dictionary!
     Assigns a value to a given box. If it updates the board record it.
     """
+    # The log starts over when it is given a board other than the one it
+    # follows, e.g. a new board after a solve()
+    if assignments.enabled and assignments.board is not values:
+        assignments.start(values)
     values[box] = value
-    if len(value) == 1:
-        assignments.append(values.copy())
+    assignments.record(assignments.s.box_index[box], assignments.s.values_mask(value))
     return values
 
 def naked_twins(values):
@@ -74,7 +166,13 @@ def solve(grid):
     # We use the sudoku class which is initialized to solve a diagnol
     # sudoku
     s = Sudoku(1)
-    return s.solve(grid)
+    if not assignments.enabled:
+        return s.solve(grid)
+    # Record every change of the board made by the search
+    b = s.search_bits(RecordedBoard(s.grid_bits(grid), assignments))
+    if b == False:
+        return False
+    return s.bits_to_values(b)
 
 if __name__ == '__main__':
     diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
@@ -94,5 +94,43 @@ class TestDiagonalSudoku(unittest.TestCase):
     def test_solve(self):
         self.assertEqual(solution.solve(self.diagonal_grid), self.solved_diag_sudoku)
 
+
+class TestAssignmentLog(unittest.TestCase):
+    diagonal_grid = TestDiagonalSudoku.diagonal_grid
+
+    def tearDown(self):
+        solution.set_recording(True)
+
+    def test_frames(self):
+        solution.set_recording(True)
+        d = solution.solve(self.diagonal_grid)
+        self.assertTrue(len(solution.assignments) > 0)
+        frames = list(solution.assignments.frames())
+        self.assertEqual(frames[-1], d)
+        for f in solution.assignments.frames(solved_only=True):
+            self.assertEqual(len(f), 81)
+
+    def test_assign_value(self):
+        solution.set_recording(True)
+        solution.assignments.clear()
+        values = dict((b, '123456789') for b in solution.assignments.s.boxes)
+        solution.assign_value(values, 'A1', '5')
+        solution.assign_value(values, 'A2', '12')
+        self.assertEqual(len(solution.assignments), 2)
+        self.assertEqual(list(solution.assignments)[-1], values)
+
+    def test_assign_value_after_solve(self):
+        solution.set_recording(True)
+        solution.solve(self.diagonal_grid)
+        values = dict((b, '123456789') for b in solution.assignments.s.boxes)
+        solution.assign_value(values, 'A1', '5')
+        self.assertEqual(len(solution.assignments), 1)
+        self.assertEqual(list(solution.assignments)[-1], values)
+
+    def test_recording_off(self):
+        solution.set_recording(False)
+        self.assertEqual(solution.solve(self.diagonal_grid), TestDiagonalSudoku.solved_diag_sudoku)
+        self.assertEqual(len(solution.assignments), 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+class SolveStats:
+    '''Counters of the work done by a Sudoku solver, switched on by setting
+       the stats attribute of the solver to an instance of this class:
+
+           s.stats = SolveStats()
+
+       The solver then adds to the counters on every search or count. With
+       stats left at None the solver only checks the attribute once per
+       propagation pass and node, so switching it off costs next to nothing.
+
+       eliminate, only_choice and subsets are the number of candidate masks
+       changed by each technique (subsets covers the naked and hidden subsets
+       looked for when propagation stalls). The changes of a propagation pass
+       that ends in a contradiction are not counted since they are undone. A
+       branch is a node of the search that tries the candidates of a box and a
+       backtrack is a candidate that failed. The times are in seconds.
+    '''
+    fields = ('solves', 'nodes', 'passes', 'eliminate', 'only_choice', 'subsets',
+              'branches', 'backtracks', 'propagate_time', 'subsets_time', 'search_time')
+    __slots__ = fields
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        '''
+        Set all counters back to 0
+        '''
+        for f in self.fields:
+            setattr(self, f, 0)
+
+    def merge(self, other):
+        '''
+        Add the counters of another SolveStats or of a report() to these. Returns
+        self
+        '''
+        if isinstance(other, dict):
+            other = SolveStats.from_report(other)
+        for f in self.fields:
+            setattr(self, f, getattr(self, f) + getattr(other, f))
+        return self
+
+    def report(self):
+        '''
+        Return the counters as a dictionary that can be written as JSON, with
+        the times in milliseconds
+        '''
+        return {'solves':     self.solves,
+                'nodes':      self.nodes,
+                'passes':     self.passes,
+                'branches':   self.branches,
+                'backtracks': self.backtracks,
+                'changes':    {'eliminate':   self.eliminate,
+                               'only_choice': self.only_choice,
+                               'subsets':     self.subsets},
+                'time_ms':    {'propagate': self.propagate_time * 1000.0,
+                               'subsets':   self.subsets_time * 1000.0,
+                               'search':    self.search_time * 1000.0}}
+
+    @staticmethod
+    def from_report(report):
+        '''
+        The reverse of report()
+        '''
+        s = SolveStats()
+        for f in ('solves', 'nodes', 'passes', 'branches', 'backtracks'):
+            setattr(s, f, report[f])
+        for f in ('eliminate', 'only_choice', 'subsets'):
+            setattr(s, f, report['changes'][f])
+        for f in ('propagate', 'subsets', 'search'):
+            setattr(s, f + '_time', report['time_ms'][f] / 1000.0)
+        return s
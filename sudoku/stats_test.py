@@ -0,0 +1,68 @@
+from sudoku import Sudoku
+from stats import SolveStats
+import batch
+import unittest
+
+
+class TestSolveStats(unittest.TestCase):
+    grids = ['4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+             '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.']
+
+    def counters(self, report):
+        # The counters of a report without the times
+        return dict((k, v) for k, v in report.items() if k != 'time_ms')
+
+    def test_search(self):
+        s = Sudoku()
+        s.stats = SolveStats()
+        for g in self.grids:
+            self.assertEqual(s.solve(g), Sudoku().solve(g))
+        r = s.stats.report()
+        self.assertEqual(r['solves'], 2)
+        self.assertTrue(r['branches'] > 0)
+        self.assertTrue(r['backtracks'] < r['nodes'])
+        self.assertTrue(r['passes'] >= r['nodes'])
+        self.assertTrue(r['changes']['eliminate'] > r['changes']['only_choice'] > 0)
+        self.assertEqual(r['changes']['subsets'], 0)
+        self.assertTrue(r['time_ms']['search'] >= r['time_ms']['propagate'] > 0)
+
+    def test_single_solve(self):
+        s = Sudoku()
+        s.stats = SolveStats()
+        s.solve(self.grids[0])
+        self.assertEqual(s.stats.nodes, s.nodes)
+        s.stats.clear()
+        s.count_solutions(self.grids[0])
+        self.assertEqual((s.stats.solves, s.stats.nodes), (1, s.nodes))
+        # A board solved by propagation alone needs no branch
+        s.stats.clear()
+        s.solve('..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..')
+        self.assertEqual((s.stats.branches, s.stats.backtracks), (0, 0))
+
+    def test_subsets(self):
+        s = Sudoku()
+        s.naked_size  = 4
+        s.hidden_size = 2
+        s.stats = SolveStats()
+        s.solve(self.grids[1])
+        self.assertTrue(s.stats.subsets > 0)
+        self.assertTrue(s.stats.subsets_time > 0)
+
+    def test_merge(self):
+        s = Sudoku()
+        s.stats = SolveStats()
+        s.solve(self.grids[0])
+        r = s.stats.report()
+        self.assertEqual(SolveStats.from_report(r).report(), r)
+        total = SolveStats().merge(r).merge(s.stats)
+        self.assertEqual(total.nodes, 2 * s.stats.nodes)
+
+    def test_batch(self):
+        single, pool = SolveStats(), SolveStats()
+        solutions = list(batch.solve_batch(self.grids * 2, workers=1, stats=single))
+        self.assertEqual(list(batch.solve_batch(self.grids * 2, workers=2, chunk_size=1, stats=pool)), solutions)
+        self.assertEqual(single.solves, 4)
+        self.assertEqual(self.counters(single.report()), self.counters(pool.report()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+# Imports
+import io
+import os
+import mmap
+import stat
+from topology import get_topology
+
+class MalformedPuzzle(ValueError):
+    '''Raised by a strict PuzzleReader for a line that is not a puzzle. The
+       line number, from 1, is kept in the line attribute
+    '''
+    def __init__(self, line, message):
+        ValueError.__init__(self, 'line %d: %s' % (line, message))
+        self.line = line
+
+def iter_lines(f, block=1 << 20):
+    '''
+    Generator over the lines of a file as (line number, bytes) without the
+    newline. A regular file is memory mapped and split block bytes at a time,
+    anything else (e.g. a pipe) is read a line at a time
+    '''
+    f = getattr(f, 'buffer', f)
+    try:
+        st = os.fstat(f.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+        for n, line in enumerate(f, 1):
+            yield n, line.rstrip(b'\n')
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        n    = 0
+        rest = b''
+        for pos in range(0, len(m), block):
+            lines = (rest + m[pos:pos+block]).split(b'\n')
+            # The last line of a block goes on in the next one
+            rest  = lines.pop()
+            for line in lines:
+                n += 1
+                yield n, line
+        if rest:
+            yield n + 1, rest
+
+class PuzzleReader:
+    '''Reads puzzles from a file of one puzzle per line, each one a record of
+       one character per box with '.' or '0' for a blank box. White space
+       around a record is ignored, empty lines and lines starting with '#'
+       are skipped, like read_puzzles() in batch.py.
+
+       Records are checked for their length and characters as bytes, before
+       any string is made of them. A malformed line is kept in errors as
+       (line number, message) and given as None, so the puzzles that follow
+       keep their place, or with strict=True raises MalformedPuzzle.
+    '''
+    def __init__(self, f, is_diag=0, size=3, strict=False):
+        t = get_topology(is_diag, size)
+        self.f       = f
+        self.n_boxes = len(t.boxes)
+        self.strict  = strict
+        self.errors  = []
+        # Mask of every byte, 0 for a byte that is not allowed in a record
+        self.table   = [0] * 256
+        for c, m in t.char_bits.items():
+            self.table[ord(c)] = m
+        self.allowed = bytes(bytearray(ord(c) for c in t.char_bits))
+
+    def check(self, record):
+        # Return None if a record is a puzzle, otherwise the error
+        if len(record) != self.n_boxes:
+            return 'a puzzle needs %d characters, not %d' % (self.n_boxes, len(record))
+        bad = record.translate(None, self.allowed)
+        if bad:
+            return 'invalid character %r' % bad[:1].decode('latin-1')
+        return None
+
+    def records(self):
+        '''
+        Generator over (line number, record) for every puzzle of the file,
+        the record as bytes or None if the line is malformed
+        '''
+        for n, line in iter_lines(self.f):
+            line = line.strip()
+            if not line or line.startswith(b'#'):
+                continue
+            error = self.check(line)
+            if error is not None:
+                if self.strict:
+                    raise MalformedPuzzle(n, error)
+                self.errors.append((n, error))
+                line = None
+            yield n, line
+
+    def lines(self):
+        '''
+        Generator over the puzzles as strings, an empty string for a
+        malformed line
+        '''
+        for _, record in self.records():
+            yield record.decode('ascii') if record is not None else ''
+
+    def boards(self):
+        '''
+        Generator over (line number, board) for every puzzle of the file, the
+        board in bitmask form or None if the line is malformed
+        '''
+        table = self.table
+        for n, record in self.records():
+            yield n, list(map(table.__getitem__, record)) if record is not None else None
+
+class SolutionWriter:
+    '''Writes solutions to a file, one per line, lines at a time in a single
+       write. Boards in bitmask form are written without making a dictionary
+       or a string per box.
+    '''
+    def __init__(self, f, is_diag=0, size=3, lines=4096):
+        t = get_topology(is_diag, size)
+        self.f       = getattr(f, 'buffer', f)
+        self.lines   = lines
+        self.pending = []
+        # Character of every solved mask, any other mask is written as '.'
+        self.chars   = dict((m, d.encode('ascii')) for d, m in t.digit_bits)
+
+    def write(self, line):
+        '''
+        Write a solution given as a string
+        '''
+        self.pending.append(line.encode('ascii'))
+        if len(self.pending) >= self.lines:
+            self.flush()
+
+    def write_board(self, b):
+        '''
+        Write a solution given as a board in bitmask form, or an empty line if
+        b is False
+        '''
+        chars = self.chars
+        self.pending.append(b''.join([chars.get(m, b'.') for m in b]) if b != False else b'')
+        if len(self.pending) >= self.lines:
+            self.flush()
+
+    def flush(self):
+        '''
+        Write the pending lines
+        '''
+        if self.pending:
+            self.f.write(b'\n'.join(self.pending) + b'\n')
+            self.pending = []
+        self.f.flush()
@@ -0,0 +1,64 @@
+from sudoku import Sudoku
+from stream import PuzzleReader, SolutionWriter, MalformedPuzzle
+import io
+import os
+import tempfile
+import unittest
+
+
+class TestStream(unittest.TestCase):
+    grid = '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......'
+    data = ('# a comment\n' + grid + '\n\n' + grid.replace('.', '0') + '\r\n' +
+            grid[:80] + '\n' + grid[:80] + 'x\n' + grid).encode('ascii')
+
+    def check(self, f):
+        reader = PuzzleReader(f)
+        lines  = list(reader.lines())
+        self.assertEqual(lines, [self.grid, self.grid.replace('.', '0'), '', '', self.grid])
+        self.assertEqual([n for n, _ in reader.errors], [5, 6])
+        self.assertIn("'x'", reader.errors[1][1])
+
+    def test_file(self):
+        # A file on disk is memory mapped
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.data)
+        try:
+            with open(path, 'rb') as f:
+                self.check(f)
+            with open(path) as f:
+                self.check(f)
+        finally:
+            os.remove(path)
+
+    def test_stream(self):
+        self.check(io.BytesIO(self.data))
+
+    def test_strict(self):
+        reader = PuzzleReader(io.BytesIO(self.data), strict=True)
+        with self.assertRaises(MalformedPuzzle) as e:
+            list(reader.records())
+        self.assertEqual(e.exception.line, 5)
+        self.assertTrue(str(e.exception).startswith('line 5:'))
+
+    def test_boards(self):
+        s = Sudoku()
+        boards = list(PuzzleReader(io.BytesIO(self.data)).boards())
+        self.assertEqual(boards[0], (2, s.grid_bits(self.grid)))
+        self.assertEqual(boards[1][1], s.grid_bits(self.grid))
+        self.assertEqual(boards[2], (5, None))
+
+    def test_writer(self):
+        s = Sudoku()
+        b = s.solve(s.grid_bits(self.grid))
+        f = io.BytesIO()
+        w = SolutionWriter(f, lines=2)
+        w.write_board(b)
+        w.write_board(False)
+        self.assertEqual(f.getvalue(), (s.bits_grid(b) + '\n\n').encode('ascii'))
+        w.write('123')
+        w.flush()
+        self.assertEqual(f.getvalue().splitlines()[2], b'123')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,28 +1,66 @@
+# Imports
+import time
+from itertools import combinations
+from topology import get_topology
+from dlx import get_exact_cover
+from sat import get_sat_encoding
+
+class SearchCancelled(Exception):
+    '''Raised by the search when its stop() callback asks it to give up'''
+    pass
+
 class Sudoku:
     '''A set of functions to solve a Sudoku puzzle. Optionally
        it can also solve a diagnol sudoku - but this requires the class
-       to  be initialized with is_diag=1
+       to  be initialized with is_diag=1. Boards larger than 9x9 are
+       solved by initializing the class with the size of a square, e.g.
+       size=4 for a 16x16 board
     '''
-    def __init__(self, is_diag=0):
-        self.boxes     = self.cross(self.rows,self.cols)
-        self.row_units = [self.cross(r,self.cols) for r in self.rows]
-        self.col_units = [self.cross(self.rows,c) for c in self.cols]
-        self.sqr_units = [self.cross(r,c)                \
-                          for r in ['ABC', 'DEF', 'GHI'] \
-                          for c in ['123', '456', '789']]
-        # Diagnol units are boxes that are in a diagnol in the sudoku - in mathematical
-        # terms these are boxes for which the column and row number is the same
-        self.dia_units = [[r+c for r,c in zip(self.rows,self.cols)],
-                          [r+c for r,c in zip(self.rows,self.cols[::-1])]]
-
-        # All units (include diagnol units if is_diag=1)
-        self.lst_units = self.row_units + self.col_units + self.sqr_units + (self.dia_units if is_diag==1 else [])
-        self.units     = dict((s, [u for u in self.lst_units if s in u]) for s in self.boxes)
-        self.peers     = dict((s, set(sum(self.units[s],[]))-set([s])) for s in self.boxes)
+    def __init__(self, is_diag=0, backend='propagate', size=3):
+        # The boxes, units and peers are shared by all instances of the same
+        # variant, so creating a solver does not rebuild them
+        t = get_topology(is_diag, size)
+        self.topology   = t
+        self.is_diag    = is_diag
+        self.size       = size
+        self.rows       = t.rows
+        self.cols       = t.cols
+        self.digits     = t.digits
+        # The search is done either by constraint propagation and depth first
+        # search ('propagate'), as an exact cover problem ('dlx') or as a
+        # satisfiability problem ('sat')
+        assert backend in self.backends
+        self.backend    = backend
+        self.boxes      = t.boxes
+        self.row_units  = t.row_units
+        self.col_units  = t.col_units
+        self.sqr_units  = t.sqr_units
+        self.dia_units  = t.dia_units
+        self.lst_units  = t.lst_units
+        self.units      = t.units
+        self.peers      = t.peers
+        self.box_index  = t.box_index
+        self.unit_index = t.unit_index
+        self.row_index  = t.row_index
+        self.col_index  = t.col_index
+        self.sqr_index  = t.sqr_index
+        self.peer_index = t.peer_index
+        self.box_units  = t.box_units
+        self.digit_bits = t.digit_bits
+        self.all_bits   = t.all_bits
+        self.char_bits  = t.char_bits
+        self.bit_counts = t.bit_counts
+        # Subset elimination pays off on boards larger than 9x9
+        if size > 3:
+            self.naked_size  = 2
+            self.hidden_size = 2
 
         # Variables
+    backends  = ['propagate', 'dlx', 'sat']
+    size      = 3
     rows      = 'ABCDEFGHI'
     cols      = '123456789'
+    digits    = '123456789'
     boxes     = []
     row_units = []
     col_units = []
@@ -30,6 +68,18 @@ class Sudoku:
     lst_units = []
     units     = {}
     peers     = {}
+    nodes     = 0
+    # Largest naked and hidden subsets looked for by the search when
+    # propagation stalls, 0 switches subset elimination off. Boards larger
+    # than 9x9 look for pairs by default
+    naked_size  = 0
+    hidden_size = 0
+    # A callable polled at every node of the search, the search raises
+    # SearchCancelled as soon as it returns True (None to never stop)
+    stop        = None
+    # A stats.SolveStats that counts the work done by the solver (None to
+    # count nothing)
+    stats       = None
 
     # function: cross
     def cross(self, a,b):
@@ -37,19 +87,82 @@ class Sudoku:
         # strings
         return [s+t for s in a for t in b]
 
+    # function: check_grid()
+    def check_grid(self, s):
+        # Raise ValueError unless a grid has one character per box, each a
+        # digit or '.' or '0' for a blank box
+        if len(s) != len(self.boxes):
+            raise ValueError('a grid needs %d characters, not %d' % (len(self.boxes), len(s)))
+        for c in s:
+            if c not in self.char_bits:
+                raise ValueError('invalid character %r in a grid' % c)
+
     # function: grid_values()
     def grid_values(self, s, con=0):
         # A function to convert a string representation of
         # grid values into a dictionary. Create a dictionary
-        # for a string of upto 81 characters only
+        # for a string of one character per box only. Blank
+        # boxes are '.' or '0'
+        self.check_grid(s)
         d = {}
-        i = 0
-        for r in self.rows:
-            for c in self.cols:
-                d[r+c] = ('123456789' if s[i]=='.' and con==0 else s[i])
-                i+=1
+        for b, c in zip(self.boxes, s):
+            if c in '.0':
+                c = self.digits if con==0 else '.'
+            d[b] = c
         return d
 
+    # function: grid_bits()
+    def grid_bits(self, s):
+        # Same as grid_values() but returns the bitmask form of the
+        # grid, i.e. a list of one candidate mask per box. A grid that is not
+        # valid is looked at again by check_grid() for the error
+        char_bits = self.char_bits
+        try:
+            b = [char_bits[c] for c in s]
+        except KeyError:
+            b = None
+        if b is None or len(b) != len(self.boxes):
+            self.check_grid(s)
+        return b
+
+    # function: bits_grid()
+    def bits_grid(self, b):
+        # The reverse of grid_bits(). Boxes that are not solved are
+        # written as '.'
+        return ''.join(self.mask_values(m) if m and not m & (m-1) else '.' for m in b)
+
+    # function: values_mask()
+    def values_mask(self, v):
+        # Convert a string of candidate digits into a bitmask. Anything that
+        # is not a digit (e.g. '.') does not set a bit
+        m = 0
+        for d, bit in self.digit_bits:
+            if d in v:
+                m |= bit
+        return m
+
+    # function: mask_values()
+    def mask_values(self, m):
+        # Convert a bitmask back into a string of candidate digits
+        return ''.join(d for d, bit in self.digit_bits if m & bit)
+
+    # function: values_to_bits()
+    def values_to_bits(self, d):
+        # Convert the dictionary form of a board into the bitmask form
+        return [self.values_mask(d[b]) for b in self.boxes]
+
+    # function: bit_count()
+    def bit_count(self, m):
+        # Return the number of candidates in a bitmask
+        if m >> 16:
+            return self.bit_counts[m & 0xFFFF] + self.bit_counts[m >> 16]
+        return self.bit_counts[m]
+
+    # function: bits_to_values()
+    def bits_to_values(self, b):
+        # Convert the bitmask form of a board into the dictionary form
+        return dict((box, self.mask_values(m)) for box, m in zip(self.boxes, b))
+
     # function: eliminate()
     def eliminate(self, d):
         # A function that reads a dictionary, if it finds
@@ -71,6 +184,22 @@ class Sudoku:
         # Return back the updated dictionary
         return d
 
+    # function: eliminate_bits()
+    def eliminate_bits(self, b, trail=None):
+        # Bitmask version of eliminate(). A box is solved if exactly
+        # one bit of its mask is set. If a trail is given then the old
+        # mask of every box that changes is appended to it so that the
+        # change can be undone later
+        solved = [i for i, m in enumerate(b) if m and not m & (m-1)]
+        for i in solved:
+            v = b[i]
+            for p in self.peer_index[i]:
+                if b[p] & v:
+                    if trail is not None:
+                        trail.append((p, b[p]))
+                    b[p] &= ~v
+        return b
+
     # function: only_choice()
     def only_choice(self, d):
         # A function that reads a dictionary and checks in a square
@@ -82,10 +211,10 @@ class Sudoku:
             # Generate a dictionary of boxes that are part of
             # a square, row or column
             mult_values = {}
-            for i in range(0,9):
+            for i in range(0,len(sqr)):
                 mult_values[sqr[i]] = d[sqr[i]]
             # Iterate over these multiple values from 1-9
-            for i in '123456789':
+            for i in self.digits:
                 mult_values_found = []
                 for m_key in mult_values.keys():
                     if i in mult_values[m_key]:
@@ -98,136 +227,504 @@ class Sudoku:
                     d[key] = i
         return d
 
-    # function: only_choice()
+    # function: only_choice_bits()
+    def only_choice_bits(self, b, trail=None):
+        # Bitmask version of only_choice(). The digits that appear exactly
+        # once in a unit are found by folding the masks of the unit into
+        # the digits seen at least once and the digits seen more than once
+        for unit in self.unit_index:
+            masks = [b[i] for i in unit]
+            once  = 0
+            twice = 0
+            for m in masks:
+                twice |= once & m
+                once  |= m
+            only = once & ~twice
+            # Digits are assigned from low to high as in only_choice()
+            for _, bit in self.digit_bits:
+                if only & bit:
+                    for i, m in zip(unit, masks):
+                        if m & bit:
+                            if b[i] != bit:
+                                if trail is not None:
+                                    trail.append((i, b[i]))
+                                b[i] = bit
+                            break
+        return b
+
+    # function: reduce_puzzle()
     def reduce_puzzle(self, d):
         # A function that reads a dictionary of values which are
-        # represented in digits and dots
-        stalled = False
-        while not stalled:
-            # Check how many boxes have a determined value
-            solved_d_before = len([box for box in d.keys() if len(d[box]) == 1])
-
-            # Your code here: Use the Eliminate Strategy
-            d = self.eliminate(d)
-            # Your code here: Use the Only Choice Strategy
-            d = self.only_choice(d)
-
-            # Check how many boxes have a determined value, to compare
-            solved_d_after = len([box for box in d.keys() if len(d[box]) == 1])
-            # If no new values were added, stop the loop.
-            stalled = solved_d_before == solved_d_after
-
-            # Sanity check, return False if there is a box with zero available values:
-            if len([box for box in d.keys() if len(d[box]) == 0]):
-                return False
+        # represented in digits and dots and applies eliminate and
+        # only_choice until nothing changes. Returns False if a
+        # contradiction is found
+        b = self.reduce_puzzle_bits(self.values_to_bits(d))
+        if b == False:
+            return False
+        d.update(self.bits_to_values(b))
         return d
 
+    # function: reduce_puzzle_bits()
+    def reduce_puzzle_bits(self, b, trail=None):
+        # Bitmask version of reduce_puzzle(). Every box and unit is
+        # visited once, after that only the ones touched by a change
+        if not self.propagate(b, range(len(b)), trail):
+            return False
+        return b
+
+    # function: propagate()
+    def propagate(self, b, boxes, trail=None):
+        # Constraint propagation on the bitmask form of a board, driven by a
+        # worklist of the boxes whose candidates have changed. A solved box
+        # removes its digit from its peers (eliminate) and every unit of a
+        # changed box is checked for digits with a single place left
+        # (only_choice). Boxes changed by either step go back on the worklist.
+        # Returns False at the first contradiction, i.e. a box without
+        # candidates or a digit without a place in a unit
+        peer_index = self.peer_index
+        unit_index = self.unit_index
+        box_units  = self.box_units
+        all_bits   = self.all_bits
+        stats      = self.stats
+        # The changes made by each technique are counted by the growth of
+        # the trail
+        if stats is not None and trail is None:
+            trail = []
+        queue = list(boxes)
+        units = set()
+        while queue:
+            if stats is not None:
+                stats.passes += 1
+                mark = len(trail)
+            # Eliminate
+            while queue:
+                i = queue.pop()
+                m = b[i]
+                if m == 0:
+                    return False
+                units.update(box_units[i])
+                if not m & (m-1):
+                    for p in peer_index[i]:
+                        pm = b[p]
+                        if pm & m:
+                            if trail is not None:
+                                trail.append((p, pm))
+                            b[p] = pm = pm & ~m
+                            if pm == 0:
+                                return False
+                            queue.append(p)
+            if stats is not None:
+                stats.eliminate += len(trail) - mark
+                mark = len(trail)
+            # Only choice on the units that were touched
+            for u in units:
+                unit  = unit_index[u]
+                once  = 0
+                twice = 0
+                for i in unit:
+                    m = b[i]
+                    twice |= once & m
+                    once  |= m
+                if once != all_bits:
+                    return False
+                only = once & ~twice
+                while only:
+                    bit   = only & -only
+                    only ^= bit
+                    for i in unit:
+                        if b[i] & bit:
+                            if b[i] != bit:
+                                if trail is not None:
+                                    trail.append((i, b[i]))
+                                b[i] = bit
+                                queue.append(i)
+                            break
+            units.clear()
+            if stats is not None:
+                stats.only_choice += len(trail) - mark
+        return True
+
     def naked_twins(self, d):
         """This function called naked_twins looks for pair of numbers that appear
            exactly again in its peers. This implies that those numbers can only be
            placed in one of the two boxes, which also implies that they can be removed
            from all other boxes in its units"""
-        # First find duplicates in columns
-        for i in range(9):
-            for j in range(9):
-                curr_box_j_key = self.col_units[i][j]
-                if len(d[curr_box_j_key])==2:
-                    match = 0
-                    for k in range(j+1,9):
-                        if d[curr_box_j_key] == d[self.col_units[i][k]]:
-                            match = 1
-                    if match == 1:
-                        for k in range(9):
-                            curr_box_k_key = self.col_units[i][k]
-                            if d[curr_box_j_key] != d[curr_box_k_key]:
-                                for digit in d[curr_box_j_key]:
-                                    if digit in d[curr_box_k_key]:
-                                        d[curr_box_k_key] = d[curr_box_k_key].replace(digit,'')
-        # Second find duplicates in rows
-        for i in range(9):
-            for j in range(9):
-                curr_box_j_key = self.row_units[i][j]
-                if len(d[curr_box_j_key])==2:
-                    match = 0
-                    for k in range(j+1,9):
-                        if d[curr_box_j_key] == d[self.row_units[i][k]]:
-                            match = 1
-                    if match == 1:
-                        for k in range(9):
-                            curr_box_k_key = self.row_units[i][k]
-                            if d[curr_box_j_key] != d[curr_box_k_key]:
-                                for digit in d[curr_box_j_key]:
-                                    if digit in d[curr_box_k_key]:
-                                        d[curr_box_k_key] = d[curr_box_k_key].replace(digit,'')
-        # Third find duplicates in squares
-        for i in range(9):
-            for j in range(9):
-                curr_box_j_key = self.sqr_units[i][j]
-                if len(d[curr_box_j_key])==2:
-                    match = 0
-                    for k in range(j+1,9):
-                        if d[curr_box_j_key] == d[self.sqr_units[i][k]]:
-                            match = 1
-                    if match == 1:
-                        for k in range(9):
-                            curr_box_k_key = self.sqr_units[i][k]
-                            if d[curr_box_j_key] != d[curr_box_k_key]:
-                                for digit in d[curr_box_j_key]:
-                                    if digit in d[curr_box_k_key]:
-                                        d[curr_box_k_key] = d[curr_box_k_key].replace(digit,'')
+        b = self.naked_twins_bits(self.values_to_bits(d))
+        d.update(self.bits_to_values(b))
         return d
+
+    # function: naked_twins_bits()
+    def naked_twins_bits(self, b):
+        # Bitmask version of naked_twins(). The units are scanned columns
+        # first, then rows and squares, and the diagonals of a diagonal sudoku
+        # last. Within a unit the boxes are scanned in order and a pair takes
+        # its digits out of the other boxes at once, so a pair left by an
+        # earlier one is found in the same scan. The search uses
+        # subsets_bits() instead, which looks at all the subsets of a unit
+        # before it changes any box
+        n = len(self.row_units)
+        unit_index = self.unit_index
+        for u in list(range(n, 2*n)) + list(range(n)) + list(range(2*n, len(unit_index))):
+            unit = unit_index[u]
+            for j, i in enumerate(unit):
+                m = b[i]
+                if self.bit_count(m) != 2 or not any(b[k] == m for k in unit[j+1:]):
+                    continue
+                for k in unit:
+                    if b[k] != m and b[k] & m:
+                        b[k] &= ~m
+        return b
+
+    # function: subsets_bits()
+    def subsets_bits(self, b, trail=None, naked=4, hidden=2, units=None):
+        # Subset elimination over the units given by their indices, by default
+        # every unit (including the diagnol units of a diagnol sudoku). A
+        # naked subset is a group of n boxes in a unit whose
+        # candidates together are n digits, these digits can be removed from the
+        # other boxes of the unit. A hidden subset is a group of n digits that
+        # together can only be placed in n boxes of a unit, all other digits can
+        # be removed from these boxes. Naked subsets of up to naked boxes and
+        # hidden subsets of up to hidden digits are used.
+        # Returns the list of boxes that changed or False on a contradiction
+        changed = []
+        n_digits = len(self.digits)
+        unit_index = self.unit_index
+        for u in (range(len(unit_index)) if units is None else units):
+            unit = unit_index[u]
+            # Hidden singles and pairs. Digits that share the same two places
+            # are grouped by these places
+            if hidden:
+                # Index the unit in a single pass: for every digit the positions
+                # in the unit where it is still a candidate, as a bitmask
+                places = [0] * n_digits
+                for k, i in enumerate(unit):
+                    m = b[i]
+                    while m:
+                        bit = m & -m
+                        m  ^= bit
+                        places[bit.bit_length()-1] |= 1 << k
+                pairs = {}
+                for d, p in enumerate(places):
+                    bit = 1 << d
+                    if p == 0:
+                        return False
+                    if not p & (p-1):
+                        i = unit[p.bit_length()-1]
+                        if b[i] != bit:
+                            if not b[i] & bit:
+                                return False
+                            if trail is not None:
+                                trail.append((i, b[i]))
+                            b[i] = bit
+                            changed.append(i)
+                    elif hidden > 1 and self.bit_count(p) == 2:
+                        pairs[p] = pairs.get(p, 0) | bit
+                for p, m in pairs.items():
+                    if self.bit_count(m) == 2:
+                        for k, i in enumerate(unit):
+                            if p & (1 << k) and b[i] & ~m:
+                                if not b[i] & m:
+                                    return False
+                                if trail is not None:
+                                    trail.append((i, b[i]))
+                                b[i] &= m
+                                changed.append(i)
+
+            # Naked pairs, triples and quads. Only unsolved boxes with at most
+            # naked candidates can be part of one
+            for size in range(2, naked+1):
+                open_boxes = [i for i in unit if b[i] & (b[i]-1) and self.bit_count(b[i]) <= size]
+                if len(open_boxes) < size:
+                    continue
+                for group in combinations(open_boxes, size):
+                    m = 0
+                    for i in group:
+                        m |= b[i]
+                    n = self.bit_count(m)
+                    if n < size:
+                        return False
+                    if n == size:
+                        for i in unit:
+                            if b[i] & m and b[i] & ~m:
+                                if trail is not None:
+                                    trail.append((i, b[i]))
+                                b[i] &= ~m
+                                changed.append(i)
+                            elif b[i] & m and i not in group:
+                                return False
+        return changed
+
+    # function: search()
     def search(self, d):
         """Using depth-first search and propagation, create
-           a search tree and solve the sudoku."""
-        # First, reduce the puzzle using the previous function
-        # Choose one of the unfilled squares with the fewest possibilities
-        # Now use recursion to solve each one of the resulting sudokus, and if one returns
-        # a value (not False), return that answer!
-
-        # Input is a sudoku puzzle dictionary. A solution is found using
-        # the reduce_puzzle function. If it returns false, a solution was not found, then
-        # traverse the next possible outcome in the tree. In order to traverse the tree
-        # using DFS, we traverse column by column from top to bottom. First create a tree
-        # with two possible values, then tree possible values and so on.
-
-        # 1. Find a solution by reducing the puzzle
-        d = self.reduce_puzzle(d)
-        if d == False:
+           a search tree and solve the sudoku. The board can be given
+           in dictionary or bitmask form and is returned in the same form.
+           Returns False if the board has no solution."""
+        if isinstance(d, list):
+            return self.search_bits(d)
+        # The search itself runs on the bitmask form of the board
+        b = self.search_bits(self.values_to_bits(d))
+        if b == False:
             return False
+        return self.bits_to_values(b)
 
-        d_num = len([box for box in d.keys() if len(d[box]) == 1])
-
-        # 2. Return if a solution is found
-        if d_num >= 81:
-            return d
-
-        # 3. Find all boxes that dont have a solution. As we are implementing a DFS
-        #    search, we want to generate all keys on a column by column basis
-        for i in [2,3,4,5]:
-            d_keys = [box for col in self.col_units for box in col if len(d[box]) == i]
-
-            # Early terminate if no keys found
-            if len(d_keys) == 0:
-                return d
-
-            # 4. If a solution isn't found, then iterate on a column basis on
-            #    possible solutions, by modifying the dictionary to correct the
-            #    first occurence of multiple values
-            c_key = d_keys[0] # Take the first occurence
-            for j in d[c_key]: # Iterate over all possible values
-                d_temp        = d.copy()
-                d_temp[c_key] = j # Pick the jth possible value
-                d_temp        = self.search(d_temp)
-                # Check for error condition. If a solution is not found then
-                # continue to a different iteration
-                if d_temp == False:
-                    continue
-                else:
-                    return d_temp
+    # function: search_bits()
+    def search_bits(self, b):
+        # Depth first search on the bitmask form of a board. The board is
+        # updated in place and every change is recorded on a trail, so a
+        # failed branch is undone by popping the trail rather than by
+        # copying the board at every node. The number of nodes visited by
+        # the last search is kept in self.nodes
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
+        try:
+            if self.backend == 'dlx':
+                return self.search_exact_cover(b)
+            if self.backend == 'sat':
+                return self.search_sat(b)
+            self.nodes = 0
+            trail = []
+            try:
+                found = self.search_node(b, trail, range(len(b)))
+            except SearchCancelled:
+                self.undo(b, trail, 0)
+                raise
+            if not found:
+                self.undo(b, trail, 0)
+                return False
+            return b
+        finally:
+            if stats is not None:
+                stats.solves      += 1
+                stats.nodes       += self.nodes
+                stats.search_time += time.perf_counter() - start
+
+    # function: search_exact_cover()
+    def search_exact_cover(self, b):
+        # Solve the bitmask form of a board with Algorithm X. The board is
+        # updated in place
+        x = get_exact_cover(self.is_diag, self.size)
+        solutions = x.solutions(b, 1)
+        self.nodes = x.nodes
+        if not solutions:
+            return False
+        for i, m in enumerate(solutions[0]):
+            if b[i] != m:
+                b[i] = m
+        return b
+
+    # function: search_sat()
+    def search_sat(self, b):
+        # Solve the bitmask form of a board with the CDCL solver. The board is
+        # updated in place
+        x = get_sat_encoding(self.is_diag, self.size)
+        solutions = x.solutions(b, 1, self.stop)
+        self.nodes = x.nodes
+        if solutions is None:
+            raise SearchCancelled()
+        if not solutions:
+            return False
+        for i, m in enumerate(solutions[0]):
+            if b[i] != m:
+                b[i] = m
+        return b
 
-            # If I haven't found a solution at all after iterating over all columns
-            # then return impossible solution - i.e False
+    # function: search_node()
+    def search_node(self, b, trail, boxes):
+        # Visit a single node of the search tree. boxes are the boxes that
+        # changed since the parent node was propagated. Returns True if the
+        # board has been solved, otherwise the changes made below this node
+        # are still on the trail and have to be undone by the caller
+        self.nodes += 1
+        if self.stop is not None and self.stop():
+            raise SearchCancelled()
+        if not self.infer(b, trail, boxes):
             return False
+        c_key = self.branch_box(b)
+        if c_key is None:
+            return True
+
+        # Try every candidate of the box, undoing the changes made by a
+        # failed candidate before trying the next one
+        stats = self.stats
+        if stats is not None:
+            stats.branches += 1
+        mark = len(trail)
+        for _, bit in self.digit_bits:
+            if b[c_key] & bit:
+                trail.append((c_key, b[c_key]))
+                b[c_key] = bit
+                if self.search_node(b, trail, [c_key]):
+                    return True
+                self.undo(b, trail, mark)
+                if stats is not None:
+                    stats.backtracks += 1
+        return False
+
+    # function: infer()
+    def infer(self, b, trail, boxes):
+        # Propagate the changes to boxes, followed by subset elimination when
+        # propagation stalls for as long as it finds something to propagate.
+        # The board was at a fixed point before boxes changed, so subsets are
+        # only looked for in the units of the boxes changed since, which are
+        # the boxes given and the ones recorded on the trail after them.
+        # Returns False on a contradiction
+        stats = self.stats
+        if stats is not None:
+            start  = time.perf_counter()
+            subset = 0.0
+        seen = len(trail)
+        ok = self.propagate(b, boxes, trail)
+        while ok and (self.naked_size or self.hidden_size):
+            box_units = self.box_units
+            units = set()
+            for i in boxes:
+                units.update(box_units[i])
+            for i, _ in trail[seen:]:
+                units.update(box_units[i])
+            seen = len(trail)
+            if stats is not None:
+                mark = len(trail)
+                t    = time.perf_counter()
+            boxes = self.subsets_bits(b, trail, self.naked_size, self.hidden_size, sorted(units))
+            if stats is not None:
+                subset += time.perf_counter() - t
+                if boxes != False:
+                    stats.subsets += len(trail) - mark
+            if boxes == False:
+                ok = False
+            elif not boxes:
+                break
+            else:
+                ok = self.propagate(b, boxes, trail)
+        if stats is not None:
+            stats.subsets_time   += subset
+            stats.propagate_time += time.perf_counter() - start - subset
+        return ok
+
+    # function: branch_box()
+    def branch_box(self, b):
+        # Return the unsolved box with the fewest candidates (minimum
+        # remaining values) or None if all boxes are solved. Ties go to the
+        # first box in row major order
+        c_key  = None
+        c_num  = len(self.digits) + 1
+        counts = self.bit_counts
+        split  = self.all_bits >> 16
+        for i, m in enumerate(b):
+            if m & (m-1):
+                n = counts[m & 0xFFFF] + counts[m >> 16] if split else counts[m]
+                if n < c_num:
+                    c_key, c_num = i, n
+                    if n == 2:
+                        break
+        return c_key
+
+    # function: count_solutions()
+    def count_solutions(self, grid, limit=2):
+        """
+           Count the solutions of a Sudoku grid, stopping as soon as limit
+           solutions have been found. Every branch of the search is explored
+           up to the limit, with the same propagation as search().
+           Args:
+              grid: the grid as a string or in dictionary or bitmask form
+              limit(int): the number of solutions to stop at
+           Returns:
+              The number of solutions, at most limit
+        """
+        b = self.board_bits(grid)
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
+        try:
+            if self.backend == 'dlx':
+                x = get_exact_cover(self.is_diag, self.size)
+                n = x.count(b, limit)
+                self.nodes = x.nodes
+                return n
+            if self.backend == 'sat':
+                x = get_sat_encoding(self.is_diag, self.size)
+                n = x.count(b, limit, self.stop)
+                self.nodes = x.nodes
+                if n is None:
+                    raise SearchCancelled()
+                return n
+            self.nodes = 0
+            return self.count_node(b, [], range(len(b)), limit)
+        finally:
+            if stats is not None:
+                stats.solves      += 1
+                stats.nodes       += self.nodes
+                stats.search_time += time.perf_counter() - start
+
+    # function: count_node()
+    def count_node(self, b, trail, boxes, limit):
+        # Visit a single node of the search tree and count the solutions
+        # below it, up to limit. The board is restored before returning
+        self.nodes += 1
+        if self.stop is not None and self.stop():
+            raise SearchCancelled()
+        mark  = len(trail)
+        count = 0
+        if self.infer(b, trail, boxes):
+            c_key = self.branch_box(b)
+            if c_key is None:
+                count = 1
+            else:
+                stats = self.stats
+                if stats is not None:
+                    stats.branches += 1
+                m = b[c_key]
+                for _, bit in self.digit_bits:
+                    if m & bit:
+                        trail.append((c_key, b[c_key]))
+                        b[c_key] = bit
+                        found  = self.count_node(b, trail, [c_key], limit - count)
+                        count += found
+                        if count >= limit:
+                            break
+                        if stats is not None and not found:
+                            stats.backtracks += 1
+        self.undo(b, trail, mark)
+        return count
+
+    # function: is_unique()
+    def is_unique(self, grid):
+        """
+           Return True if a Sudoku grid has exactly one solution. Grids that
+           cannot be unique are rejected without a search: a grid that leaves
+           two digits out has a second solution with these digits swapped and
+           a standard 9x9 sudoku needs at least 17 givens.
+        """
+        b = self.board_bits(grid)
+        givens = [m for m in b if m and not m & (m-1)]
+        used   = 0
+        for m in givens:
+            used |= m
+        if self.bit_count(used) < len(self.digits) - 1:
+            return False
+        if self.size == 3 and not self.is_diag and len(givens) < 17:
+            return False
+        return self.count_solutions(b, 2) == 1
+
+    # function: board_bits()
+    def board_bits(self, grid):
+        # Return a copy of a grid in bitmask form, the grid can be given as a
+        # string or in dictionary or bitmask form
+        if isinstance(grid, list):
+            return list(grid)
+        if isinstance(grid, dict):
+            return self.values_to_bits(grid)
+        return self.grid_bits(grid)
+
+    # function: undo()
+    def undo(self, b, trail, mark):
+        # Restore the board to the state it had when the trail was mark
+        # entries long
+        while len(trail) > mark:
+            i, m = trail.pop()
+            b[i] = m
 
     # function: solve
     def solve(self, grid):
@@ -236,29 +733,38 @@ class Sudoku:
            Args:
               grid(string): a string representing a sudoku grid.
               Example: '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+              The grid can also be given in dictionary or bitmask form.
            Returns:
              The dictionary representation of the final sudoku grid. False if no solution exists.
+             If the grid was given in bitmask form then the bitmask form is returned.
         """
 
+        # The bitmask form is solved as is
+        if isinstance(grid, list):
+            return self.search_bits(grid)
         # Note that the input to the solve function is a string rather and a dictionary. First
         # convert the string into a dictionary
-        d = self.grid_values(grid)
-        # We use the eliminate and only_choice functions to solve the diagnol
-        # sudoku problem. The class must be initialized with diagnol sudoku enabled
-        return self.reduce_puzzle(d)
+        d = grid if isinstance(grid, dict) else self.grid_values(grid)
+        # Propagation alone does not solve every puzzle, so search until all
+        # boxes are solved. The class must be initialized with diagnol sudoku
+        # enabled to solve a diagnol sudoku
+        return self.search(d)
 
     # function: display
     def display(self, d):
         """
         Display the values as a 2-D grid.
-        Input: The sudoku in dictionary form
+        Input: The sudoku in dictionary or bitmask form
         Output: None
         """
+        if isinstance(d, list):
+            d = self.bits_to_values(d)
+        n     = self.size
         width = 1 + max(len(d[s]) for s in self.boxes)
-        line  = '+'.join(['-'*(width*3)]*3)
-        for r in self.rows:
-            print(''.join(d[r+c].center(width) + ('|' if c in '36' else '') for c in self.cols))
-            if r in 'CF': print(line)
+        line  = '+'.join(['-'*(width*n)]*n)
+        for i, r in enumerate(self.rows):
+            print(''.join(d[r+c].center(width) + ('|' if j % n == n-1 and j < n*n-1 else '') for j, c in enumerate(self.cols)))
+            if i % n == n-1 and i < n*n-1: print(line)
         return
 
 # Main
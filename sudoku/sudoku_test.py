@@ -0,0 +1,338 @@
+from sudoku import Sudoku, SearchCancelled
+from dlx import get_exact_cover
+from sat import CDCL, get_sat_encoding, luby
+import unittest
+
+
+class TestTopology(unittest.TestCase):
+    def test_shared(self):
+        self.assertIs(Sudoku().topology, Sudoku().topology)
+        self.assertIs(Sudoku(1).peers, Sudoku(1).peers)
+        self.assertIsNot(Sudoku().topology, Sudoku(1).topology)
+
+    def test_units(self):
+        s = Sudoku(1)
+        self.assertEqual(len(s.lst_units), 29)
+        self.assertEqual(len(Sudoku().lst_units), 27)
+        self.assertEqual(len(s.peers['A1']), 26)
+        self.assertEqual(len(s.peers['A2']), 20)
+        with self.assertRaises(TypeError):
+            s.units['A1'] = []
+
+
+class TestBitmaskForm(unittest.TestCase):
+    grids = ['..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..',
+             '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+             '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3']
+
+    def test_conversion(self):
+        s = Sudoku()
+        for g in self.grids:
+            d = s.grid_values(g)
+            self.assertEqual(s.bits_to_values(s.values_to_bits(d)), d)
+            self.assertEqual(s.grid_bits(g), s.values_to_bits(d))
+
+    def test_validation(self):
+        s = Sudoku()
+        g = self.grids[0]
+        self.assertEqual(s.grid_bits(g.replace('.', '0')), s.grid_bits(g))
+        self.assertEqual(s.grid_values(g.replace('.', '0')), s.grid_values(g))
+        self.assertEqual(s.grid_values(g.replace('.', '0'), 1), s.grid_values(g, 1))
+        for bad in [g[:80], g + '.', g[:80] + 'x', g[:80] + ' ']:
+            with self.assertRaises(ValueError):
+                s.grid_bits(bad)
+            with self.assertRaises(ValueError):
+                s.grid_values(bad)
+
+    def test_matches_dict_form(self):
+        for is_diag in [0, 1]:
+            s = Sudoku(is_diag)
+            for g in self.grids:
+                for f in ['eliminate', 'only_choice', 'reduce_puzzle', 'naked_twins']:
+                    d = getattr(s, f)(s.grid_values(g))
+                    b = getattr(s, f + '_bits')(s.grid_bits(g))
+                    self.assertEqual(s.bits_to_values(b) if b else b, d)
+                d = s.search(s.grid_values(g))
+                b = s.search(s.grid_bits(g))
+                self.assertEqual(s.bits_to_values(b) if b else b, d)
+                b = s.solve(s.grid_bits(g))
+                self.assertEqual(s.bits_to_values(b) if b else b, s.solve(g))
+
+
+class TestPropagation(unittest.TestCase):
+    grids = TestBitmaskForm.grids + ['85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.']
+
+    def test_same_fixed_point_as_sweeps(self):
+        for is_diag in [0, 1]:
+            s = Sudoku(is_diag)
+            for g in self.grids:
+                b = s.grid_bits(g)
+                while True:
+                    before = list(b)
+                    s.only_choice_bits(s.eliminate_bits(b))
+                    if b == before or 0 in b:
+                        break
+                r = s.reduce_puzzle_bits(s.grid_bits(g))
+                if 0 in b:
+                    self.assertEqual(r, False)
+                else:
+                    self.assertEqual(r, b)
+
+    def test_trail_restores_board(self):
+        s = Sudoku()
+        b = s.grid_bits(self.grids[0])
+        before = list(b)
+        trail = []
+        self.assertTrue(s.propagate(b, range(81), trail))
+        s.undo(b, trail, 0)
+        self.assertEqual(b, before)
+
+
+class TestSubsets(unittest.TestCase):
+    def board(self, s, row):
+        # An empty board with the given candidates in the first row
+        b = [s.all_bits] * 81
+        for i, v in enumerate(row):
+            b[i] = s.values_mask(v)
+        return b
+
+    def test_naked_triple(self):
+        s = Sudoku()
+        b = self.board(s, ['12', '23', '13', '1234', '56789', '56789', '56789', '56789', '56789'])
+        changed = s.subsets_bits(b, naked=3, hidden=0)
+        self.assertEqual(sorted(changed), [3, 9, 10, 11, 18, 19, 20])
+        self.assertEqual(b[3], s.values_mask('4'))
+        self.assertEqual(b[9], s.values_mask('456789'))
+
+    def test_hidden_pair(self):
+        s = Sudoku()
+        b = self.board(s, ['1234', '1234', '34567', '34567', '34567', '34567', '34567', '56789', '56789'])
+        s.subsets_bits(b, naked=0, hidden=2)
+        self.assertEqual(b[0], s.values_mask('12'))
+        self.assertEqual(b[1], s.values_mask('12'))
+
+    def test_contradiction(self):
+        s = Sudoku()
+        b = self.board(s, ['12', '12', '12', '3', '4', '5', '6', '7', '89'])
+        self.assertEqual(s.subsets_bits(b), False)
+
+    def test_diagonal_units(self):
+        s = Sudoku(1)
+        d = s.grid_values('.' * 81)
+        d['A1'] = d['B2'] = '12'
+        d['I9'] = '123'
+        self.assertEqual(s.naked_twins(d)['I9'], '3')
+
+    def test_naked_twins_scan(self):
+        # The 14 pair leaves a 59 pair in the same row, which naked_twins()
+        # uses in the same scan
+        s = Sudoku()
+        b = s.naked_twins_bits(self.board(s, ['1246', '14', '3', '14', '1459', '459', '2569', '7', '8']))
+        self.assertEqual([s.mask_values(m) for m in b[:9]], ['26', '14', '3', '14', '59', '59', '26', '7', '8'])
+
+    def test_search_with_subsets(self):
+        grids = TestSearch.hard_grids
+        s = Sudoku()
+        nodes = []
+        for g in grids:
+            s.solve(g)
+            nodes.append(s.nodes)
+        s.naked_size  = 4
+        s.hidden_size = 2
+        for g, n in zip(grids, nodes):
+            TestSearch.assertSolves(self, s, g, s.solve(g))
+            self.assertTrue(s.nodes <= n)
+
+
+class TestSearch(unittest.TestCase):
+    hard_grids = ['4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+                  '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.',
+                  '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..']
+
+    def assertSolves(self, s, g, d):
+        self.assertTrue(d)
+        for b in s.boxes:
+            self.assertEqual(len(d[b]), 1)
+        for u in s.lst_units:
+            self.assertEqual(sorted(d[b] for b in u), list(s.digits))
+        for b, c in zip(s.boxes, g):
+            if c != '.':
+                self.assertEqual(d[b], c)
+
+    def test_solve_hard(self):
+        s = Sudoku()
+        for g in self.hard_grids:
+            self.assertSolves(s, g, s.solve(g))
+            self.assertTrue(s.nodes > 0)
+
+    def test_no_solution(self):
+        s = Sudoku()
+        g = '11' + '.'*79
+        self.assertEqual(s.solve(g), False)
+        b = s.grid_bits('.'*80 + '1')
+        b[0] = 1 << 1
+        b[1] = 1 << 1 | 1 << 2
+        b[2] = 1 << 1 | 1 << 2
+        before = list(b)
+        self.assertEqual(s.search(b), False)
+        self.assertEqual(b, before)
+
+    def test_stop(self):
+        s = Sudoku()
+        b = s.grid_bits(self.hard_grids[0])
+        before = list(b)
+        s.stop = lambda: s.nodes > 3
+        with self.assertRaises(SearchCancelled):
+            s.search(b)
+        self.assertEqual(b, before)
+        with self.assertRaises(SearchCancelled):
+            s.count_solutions(b)
+        s.stop = None
+        self.assertEqual(s.count_solutions(b), 1)
+
+
+class TestCountSolutions(unittest.TestCase):
+    def test_count(self):
+        for backend in Sudoku.backends:
+            s = Sudoku(0, backend, size=2)
+            self.assertEqual(s.count_solutions('.'*16, 1000), 288)
+            self.assertEqual(s.count_solutions('.'*16, 10), 10)
+            s = Sudoku(0, backend)
+            for g in TestSearch.hard_grids:
+                self.assertEqual(s.count_solutions(g), 1)
+                self.assertTrue(s.is_unique(g))
+            # Removing a given of a minimal puzzle gives more solutions
+            g = TestSearch.hard_grids[0]
+            self.assertEqual(s.count_solutions('.' + g[1:], 2), 2)
+            self.assertEqual(s.count_solutions('11' + '.'*79, 2), 0)
+
+    def test_board_not_changed(self):
+        s = Sudoku()
+        b = s.grid_bits(TestSearch.hard_grids[0])
+        before = list(b)
+        s.count_solutions(b)
+        self.assertEqual(b, before)
+
+    def test_is_unique(self):
+        s = Sudoku()
+        self.assertFalse(s.is_unique('.'*81))
+        self.assertFalse(s.is_unique('.' + TestSearch.hard_grids[0][1:]))
+        # Two digits left out
+        g = TestBitmaskForm.grids[0].replace('8', '.').replace('9', '.')
+        s.nodes = 0
+        self.assertFalse(s.is_unique(g))
+        self.assertEqual(s.nodes, 0)
+        self.assertTrue(Sudoku(1).is_unique(TestBitmaskForm.grids[2]))
+
+
+class TestExactCover(unittest.TestCase):
+    def test_same_solutions(self):
+        for is_diag, grids in [(0, TestSearch.hard_grids), (1, TestBitmaskForm.grids[2:])]:
+            s = Sudoku(is_diag, 'dlx')
+            for g in grids:
+                d = s.solve(g)
+                TestSearch.assertSolves(self, s, g, d)
+                self.assertEqual(d, Sudoku(is_diag).solve(g))
+                self.assertTrue(s.nodes > 0)
+
+    def test_no_solution(self):
+        s = Sudoku(0, 'dlx')
+        self.assertEqual(s.solve('11' + '.'*79), False)
+        self.assertEqual(Sudoku(1, 'dlx').solve(TestSearch.hard_grids[0]), False)
+
+    def test_count(self):
+        x = get_exact_cover(0)
+        s = Sudoku()
+        self.assertEqual(x.count(s.grid_bits('.'*81), 3), 3)
+        self.assertEqual(x.count(s.grid_bits(TestSearch.hard_grids[0]), 3), 1)
+        self.assertEqual(len(x.columns), 324)
+        self.assertEqual(len(get_exact_cover(1).columns), 342)
+
+
+class TestSat(unittest.TestCase):
+    def test_same_solutions(self):
+        for is_diag, grids in [(0, TestSearch.hard_grids), (1, TestBitmaskForm.grids[2:])]:
+            s = Sudoku(is_diag, 'sat')
+            for g in grids:
+                d = s.solve(g)
+                TestSearch.assertSolves(self, s, g, d)
+                self.assertEqual(d, Sudoku(is_diag).solve(g))
+
+    def test_no_solution(self):
+        self.assertEqual(Sudoku(0, 'sat').solve('11' + '.'*79), False)
+        self.assertEqual(Sudoku(1, 'sat').solve(TestSearch.hard_grids[0]), False)
+
+    def test_dimacs(self):
+        s = Sudoku()
+        b = s.grid_bits(TestSearch.hard_grids[0])
+        x = get_sat_encoding(0)
+        lines = x.dimacs(b).splitlines()
+        self.assertEqual(lines[0], 'p cnf 729 %d' % (len(lines) - 1))
+        self.assertTrue(all(l.endswith(' 0') for l in lines[1:]))
+        # The exported clauses solved from scratch give the same solution
+        e = CDCL(x.n_vars)
+        for c in x.clauses(b):
+            e.add_clause(c)
+        self.assertTrue(e.solve())
+        model = e.model()
+        self.assertEqual([1 << d for i in range(81) for d in range(9) if model[x.var(i, d)]], s.solve(list(b)))
+
+    def test_cdcl(self):
+        # The pigeonhole problem of 5 pigeons in 4 holes needs clause learning
+        # to be refuted
+        var = lambda p, h: p * 4 + h + 1
+        e = CDCL(20)
+        for p in range(5):
+            e.add_clause([var(p, h) for h in range(4)])
+        for h in range(4):
+            for p in range(5):
+                for q in range(p + 1, 5):
+                    e.add_clause([-var(p, h), -var(q, h)])
+        self.assertFalse(e.solve())
+        self.assertTrue(e.conflicts > 0)
+        self.assertEqual([luby(i) for i in range(1, 10)], [1, 1, 2, 1, 1, 2, 4, 1, 1])
+
+    def test_stop(self):
+        s = Sudoku(0, 'sat')
+        s.stop = lambda: True
+        with self.assertRaises(SearchCancelled):
+            s.solve('.'*81)
+        with self.assertRaises(SearchCancelled):
+            s.count_solutions('.'*81)
+
+    def test_large_board(self):
+        s = Sudoku(size=4, backend='sat')
+        g = TestLargeBoards.grid(None, s, 3)
+        TestSearch.assertSolves(self, s, g, s.solve(g))
+
+class TestLargeBoards(unittest.TestCase):
+    def grid(self, s, holes):
+        # A valid board made from a pattern with every holes-th box blanked
+        n = s.size
+        g = ''.join(s.digits[(n*(r % n) + r//n + c) % (n*n)] for r in range(n*n) for c in range(n*n))
+        return ''.join('.' if i % holes else c for i, c in enumerate(g))
+
+    def test_topology(self):
+        for size in [2, 4, 5]:
+            s = Sudoku(size=size)
+            n = size * size
+            self.assertEqual(len(s.boxes), n*n)
+            self.assertEqual(len(s.lst_units), 3*n)
+            self.assertEqual(len(s.peers[s.boxes[0]]), 3*n - 2*size - 1)
+            self.assertEqual(s.all_bits, (1 << n) - 1)
+            self.assertEqual(s.bit_count(s.all_bits), n)
+
+    def test_solve(self):
+        for size, holes in [(2, 2), (4, 3), (5, 2)]:
+            s = Sudoku(size=size)
+            g = self.grid(s, holes)
+            TestSearch.assertSolves(self, s, g, s.solve(g))
+            self.assertEqual(s.bits_to_values(s.solve(s.grid_bits(g))), s.solve(g))
+
+    def test_exact_cover(self):
+        s = Sudoku(size=4, backend='dlx')
+        g = self.grid(s, 2)
+        TestSearch.assertSolves(self, s, g, s.solve(g))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# Imports
+from types import MappingProxyType
+
+class Topology:
+    '''The boxes, units and peers of a sudoku variant together with the index
+       tables used by the bitmask form of a board. A variant is a standard or
+       diagnol sudoku with squares of size x size boxes, so a board has size**2
+       rows, columns and digits (size=3 is the classic 9x9 sudoku, size=4 and
+       size=5 give 16x16 and 25x25 boards). A topology never changes
+       once it has been built, so there is a single instance per variant and
+       process which is shared by all solvers - use get_topology() to get it.
+       All of the containers are tuples, frozensets or read only mappings.
+    '''
+    __slots__ = ('is_diag', 'size', 'rows', 'cols', 'digits', 'boxes',
+                 'row_units', 'col_units', 'sqr_units', 'dia_units', 'lst_units',
+                 'units', 'peers', 'box_index', 'unit_index', 'row_index',
+                 'col_index', 'sqr_index', 'peer_index', 'box_units',
+                 'digit_bits', 'all_bits', 'char_bits', 'bit_counts')
+
+    def __init__(self, is_diag=0, size=3):
+        assert 2 <= size <= 5
+        n = size * size
+        # Rows are labelled with letters and columns with numbers, so box
+        # names are e.g. 'A1' or 'P16'. Digits past 9 are written as letters
+        rows   = ROWS[:n]
+        cols   = tuple(str(c) for c in range(1, n+1))
+        digits = DIGITS[:n]
+        self.is_diag   = is_diag
+        self.size      = size
+        self.rows      = rows
+        self.cols      = cols
+        self.digits    = digits
+        self.boxes     = cross(rows, cols)
+        self.row_units = tuple(cross(r, cols) for r in rows)
+        self.col_units = tuple(cross(rows, (c,)) for c in cols)
+        self.sqr_units = tuple(cross(rows[r:r+size], cols[c:c+size])
+                               for r in range(0, n, size)
+                               for c in range(0, n, size))
+        # Diagnol units are boxes that are in a diagnol in the sudoku - in mathematical
+        # terms these are boxes for which the column and row number is the same
+        self.dia_units = (tuple(r+c for r,c in zip(rows, cols)),
+                          tuple(r+c for r,c in zip(rows, cols[::-1])))
+
+        # All units (include diagnol units if is_diag=1)
+        self.lst_units = self.row_units + self.col_units + self.sqr_units + (self.dia_units if is_diag==1 else ())
+        self.units     = MappingProxyType(dict((s, tuple(u for u in self.lst_units if s in u)) for s in self.boxes))
+        self.peers     = MappingProxyType(dict((s, frozenset(b for u in self.units[s] for b in u if b != s)) for s in self.boxes))
+
+        # Index tables for the bitmask form of a board. In the bitmask form the
+        # board is a flat list of one integer per box (row major order, so for
+        # a 9x9 board A1 is 0 and I9 is 80) and the k-th digit is a candidate
+        # of a box if bit k-1 is set
+        self.box_index  = MappingProxyType(dict((b, i) for i, b in enumerate(self.boxes)))
+        self.unit_index = self.index(self.lst_units)
+        self.row_index  = self.index(self.row_units)
+        self.col_index  = self.index(self.col_units)
+        self.sqr_index  = self.index(self.sqr_units)
+        self.peer_index = tuple(tuple(sorted(self.box_index[p] for p in self.peers[b])) for b in self.boxes)
+        self.box_units  = tuple(tuple(u for u, unit in enumerate(self.unit_index) if i in unit) for i in range(len(self.boxes)))
+        self.digit_bits = tuple((d, 1 << i) for i, d in enumerate(digits))
+        self.all_bits   = (1 << len(digits)) - 1
+        # Mask of every character allowed in a grid, a blank box is '.' or '0'
+        self.char_bits  = MappingProxyType(dict(self.digit_bits, **{'.': self.all_bits, '0': self.all_bits}))
+        # Number of candidates of every mask of up to 16 digits. A mask of a
+        # 25x25 board is looked up in two halves
+        self.bit_counts = [0] * (1 << min(n, 16))
+        for m in range(1, len(self.bit_counts)):
+            self.bit_counts[m] = self.bit_counts[m >> 1] + (m & 1)
+        self.bit_counts = tuple(self.bit_counts)
+
+    def index(self, units):
+        '''
+        Convert units of box names into units of box numbers
+        '''
+        return tuple(tuple(self.box_index[b] for b in u) for u in units)
+
+# Labels of the rows and the digits of the largest board
+ROWS   = 'ABCDEFGHIJKLMNOPQRSTUVWXY'
+DIGITS = '123456789ABCDEFGHIJKLMNOP'
+
+def cross(a, b):
+    '''
+    Return a cross of every element in the two strings (or tuples of strings)
+    '''
+    return tuple(s+t for s in a for t in b)
+
+# The topologies built so far, one per variant
+topologies = {}
+
+def get_topology(is_diag=0, size=3):
+    '''
+    Return the topology of the standard (is_diag=0) or diagnol (is_diag=1)
+    sudoku with squares of size x size boxes. It is built the first time it
+    is asked for
+    '''
+    t = topologies.get((is_diag, size))
+    if t is None:
+        t = topologies[(is_diag, size)] = Topology(is_diag, size)
+    return t
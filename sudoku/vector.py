@@ -0,0 +1,139 @@
+# Imports
+from sudoku import Sudoku
+from topology import get_topology
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class VectorSudoku:
+    '''Constraint propagation on many boards at once with NumPy.
+
+       A batch of N boards is an (N, boxes) array of candidate masks, uint16 for
+       boards of up to 16 digits and uint32 for 25x25 boards. Eliminate and
+       only choice run as array operations over index matrices of the
+       peers and units. All boards are swept together until none of them
+       changes. Only the boards that propagation alone does not solve are
+       searched one at a time by the scalar Sudoku solver, so the solutions
+       are the same as the ones of Sudoku.solve().
+       Requires numpy.
+    '''
+    def __init__(self, is_diag=0, size=3):
+        if np is None:
+            raise ImportError('VectorSudoku requires numpy')
+        t = get_topology(is_diag, size)
+        self.solver   = Sudoku(is_diag, size=size)
+        self.digits   = t.digits
+        self.all_bits = t.all_bits
+        self.dtype    = np.uint16 if len(t.digits) <= 16 else np.uint32
+        n_boxes = len(t.boxes)
+        # Peers of every box, padded with the index of an extra box that is
+        # always 0 because diagonal boxes have more peers than the others
+        width = max(len(p) for p in t.peer_index)
+        self.peers = np.array([p + (n_boxes,) * (width - len(p)) for p in t.peer_index], dtype=np.intp)
+        self.units = np.array(t.unit_index, dtype=np.intp)
+        # Where every box is in the flattened (units, unit size) array of a
+        # board, padded the same way as the peers
+        n_slots = self.units.size
+        slots   = [[] for _ in range(n_boxes)]
+        for k, i in enumerate(self.units.flat):
+            slots[i].append(k)
+        width = max(len(s) for s in slots)
+        self.slots = np.array([s + [n_slots] * (width - len(s)) for s in slots], dtype=np.intp)
+        # Mask of every character of a grid, blank boxes are '.' or '0'
+        self.table = np.zeros(256, dtype=self.dtype)
+        self.table[ord('.')] = self.table[ord('0')] = t.all_bits
+        for d, bit in t.digit_bits:
+            self.table[ord(d)] = bit
+
+    def grid_boards(self, grids):
+        '''
+        Convert a list of grids, each a string of one character per box, into
+        an array of boards. A grid that is not a puzzle becomes a board
+        without candidates, which propagation finds to have no solution
+        '''
+        s = self.solver
+        n_boxes = len(s.boxes)
+        blank = '.' * n_boxes
+        lines = []
+        bad   = []
+        for k, g in enumerate(grids):
+            try:
+                s.check_grid(g)
+            except ValueError:
+                bad.append(k)
+                g = blank
+            lines.append(g)
+        chars = np.frombuffer(''.join(lines).encode('ascii'), dtype=np.uint8)
+        B = self.table[chars.reshape(len(grids), n_boxes)]
+        B[bad] = 0
+        return B
+
+    def eliminate(self, B):
+        '''
+        Remove the digit of every solved box from its peers, on all boards at
+        once. B is changed in place and returned
+        '''
+        solved = np.where(B & (B - 1) == 0, B, 0)
+        solved = np.concatenate([solved, np.zeros((len(B), 1), dtype=B.dtype)], axis=1)
+        B &= ~np.bitwise_or.reduce(solved[:, self.peers], axis=2)
+        return B
+
+    def only_choice(self, B):
+        '''
+        Solve every box that is the only place of a digit in one of its units,
+        on all boards at once. B is changed in place and returned together with
+        a boolean array that is False for the boards with a digit that has no
+        place left or a box that is the only place of two digits
+        '''
+        M = B[:, self.units]
+        once  = np.zeros(M.shape[:2], dtype=B.dtype)
+        twice = np.zeros(M.shape[:2], dtype=B.dtype)
+        for k in range(M.shape[2]):
+            twice |= once & M[:, :, k]
+            once  |= M[:, :, k]
+        only = (once & ~twice)[:, :, None] & M
+        only = np.concatenate([only.reshape(len(B), -1), np.zeros((len(B), 1), dtype=B.dtype)], axis=1)
+        forced = np.bitwise_or.reduce(only[:, self.slots], axis=2)
+        B[:] = np.where(forced != 0, forced, B)
+        ok = (once == self.all_bits).all(axis=1) & (forced & (forced - 1) == 0).all(axis=1)
+        return B, ok
+
+    def propagate(self, B):
+        '''
+        Run eliminate and only choice on every board until none of them
+        changes. B is changed in place. Returns a boolean array that is False
+        for the boards that have no solution
+        '''
+        ok     = np.ones(len(B), dtype=bool)
+        active = np.arange(len(B))
+        while len(active):
+            A = B[active]
+            before = A.copy()
+            self.eliminate(A)
+            A, valid = self.only_choice(A)
+            valid &= (A != 0).all(axis=1)
+            B[active] = A
+            ok[active] = valid
+            # Boards that changed and have no contradiction yet go on
+            active = active[valid & (A != before).any(axis=1)]
+        return ok
+
+    def solve(self, grids):
+        '''
+        Solve a list of grids, each a string of one character per box. Returns
+        the solutions in the same order, each one a string of digits or an
+        empty string if the grid has no solution or is not a puzzle
+        '''
+        if not grids:
+            return []
+        B  = self.grid_boards(grids)
+        ok = self.propagate(B)
+        open_boards = (B & (B - 1) != 0).any(axis=1)
+        s = self.solver
+        solutions = []
+        for b, valid, unsolved in zip(B.tolist(), ok, open_boards):
+            if valid and unsolved:
+                b = s.search_bits(b)
+            solutions.append(s.bits_grid(b) if valid and b != False else '')
+        return solutions
@@ -0,0 +1,53 @@
+from sudoku import Sudoku
+import vector
+import unittest
+
+
+@unittest.skipIf(vector.np is None, 'numpy is not installed')
+class TestVectorSudoku(unittest.TestCase):
+    grids = ['..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..',
+             '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+             '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3',
+             '003020600900305001001806400008102900700000008006708200002609500800203009005010300',
+             '11' + '.'*79]
+
+    def test_propagate_matches_scalar(self):
+        for is_diag in [0, 1]:
+            v = vector.VectorSudoku(is_diag)
+            s = Sudoku(is_diag)
+            B = v.grid_boards(self.grids)
+            self.assertEqual(B.dtype, vector.np.uint16)
+            ok = v.propagate(B)
+            for g, b, valid in zip(self.grids, B.tolist(), ok):
+                r = s.reduce_puzzle_bits(s.grid_bits(g.replace('0', '.')))
+                self.assertEqual(bool(valid), r != False)
+                if valid:
+                    self.assertEqual(b, r)
+
+    def test_solve_matches_scalar(self):
+        for is_diag in [0, 1]:
+            v = vector.VectorSudoku(is_diag)
+            s = Sudoku(is_diag)
+            expected = []
+            for g in self.grids:
+                b = s.solve(s.grid_bits(g.replace('0', '.')))
+                expected.append(s.bits_grid(b) if b else '')
+            self.assertEqual(v.solve(self.grids), expected)
+        self.assertEqual(v.solve([]), [])
+
+    def test_bad_grids(self):
+        v = vector.VectorSudoku()
+        good = v.solve(self.grids[:1])[0]
+        bad = ['', self.grids[0][:-1], self.grids[0] + '.', self.grids[0][:-1] + 'x', self.grids[0][:-1] + '\xe9']
+        self.assertEqual(v.solve(bad + self.grids[:1]), [''] * len(bad) + [good])
+
+    def test_large_board(self):
+        v = vector.VectorSudoku(size=5)
+        s = Sudoku(size=5)
+        g = ''.join(s.digits[(5*(r % 5) + r//5 + c) % 25] for r in range(25) for c in range(25))
+        g = ''.join('.' if i % 2 else c for i, c in enumerate(g))
+        self.assertEqual(v.grid_boards([g]).dtype, vector.np.uint32)
+        self.assertEqual(v.solve([g]), [s.bits_grid(s.solve(s.grid_bits(g)))])
+
+if __name__ == '__main__':
+    unittest.main()
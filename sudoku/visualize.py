@@ -1,7 +1,11 @@
-from PySudoku import play
+from PySudoku import play, render
+
+def filter_assignments(assignments):
+    """ The boards of a set of assignments where a new box was solved"""
+    # An AssignmentLog rebuilds the boards from its deltas as they are played
+    if hasattr(assignments, 'frames'):
+        return assignments.frames(solved_only=True)
 
-def visualize_assignments(assignments):
-    """ Visualizes the set of assignments created by the Sudoku AI"""
     last_assignment = None
     filtered_assignments = []
 
@@ -14,4 +18,14 @@ def visualize_assignments(assignments):
                 filtered_assignments.append(assignments[i])
         last_assignment = assignments[i]
 
-    play(filtered_assignments)
+    return filtered_assignments
+
+def visualize_assignments(assignments):
+    """ Visualizes the set of assignments created by the Sudoku AI"""
+    play(filter_assignments(assignments))
+
+def render_assignments(assignments, path, fps=5):
+    """ Renders the set of assignments created by the Sudoku AI without a
+    window, to an animated GIF if path ends with .gif and otherwise to a PNG
+    per board named by the pattern path, e.g. 'frames/%04d.png'"""
+    return render(filter_assignments(assignments), path, fps)
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+import solution
+try:
+    import pygame
+    import PySudoku
+    import visualize
+    from PIL import Image
+except ImportError:
+    pygame = None
+
+
+@unittest.skipIf(pygame is None, 'pygame and Pillow are not installed')
+class TestRender(unittest.TestCase):
+    diagonal_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        solution.set_recording(True)
+        solution.solve(self.diagonal_grid)
+        self.frames = list(solution.assignments.frames(solved_only=True))
+
+    def test_gif(self):
+        path = os.path.join(self.dir, 'replay.gif')
+        self.assertEqual(visualize.render_assignments(solution.assignments, path), len(self.frames))
+        im = Image.open(path)
+        self.assertEqual(im.size, (700, 700))
+        self.assertEqual(im.n_frames, len(self.frames))
+
+    def test_gif_repeated_board(self):
+        # A board that did not change is still a frame of its own duration
+        path = os.path.join(self.dir, 'repeat.gif')
+        frames = self.frames[:2] + self.frames[1:2] + self.frames[2:3]
+        self.assertEqual(PySudoku.render(frames, path, fps=10), 4)
+        im = Image.open(path)
+        self.assertEqual(im.n_frames, 4)
+        durations = []
+        for k in range(im.n_frames):
+            im.seek(k)
+            durations.append(im.info['duration'])
+        self.assertEqual(durations, [100] * 4)
+
+    def test_png(self):
+        path = os.path.join(self.dir, '%03d.png')
+        self.assertEqual(PySudoku.render(self.frames[:3], path), 3)
+        # The last frame drawn square by square looks the same as the board drawn at once
+        PySudoku.render(self.frames[2:3], os.path.join(self.dir, 'last%d.png'))
+        self.assertEqual(Image.open(path % 2).tobytes(), Image.open(os.path.join(self.dir, 'last0.png')).tobytes())
+
+if __name__ == '__main__':
+    unittest.main()